@@ -0,0 +1,163 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib import animation
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from flujos_esenciales import Flujo
+from plotter import niveles
+
+
+TITULOS = {
+    'corriente': 'Lineas de Corriente',
+    'potencial': 'Lineas de Potencial',
+    'velocidad': 'Campo de Velocidades',
+}
+
+
+def sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+def _evaluar(flujo, X, Y, tipo, radio_nucleo):
+    if tipo == 'velocidad':
+        return np.ma.stack(flujo.campo(X, Y, tipo, radio_nucleo))
+    return flujo.campo(X, Y, tipo, radio_nucleo)
+
+
+def _campo(transiente, estatico, X, Y, tipo, radio_nucleo, t):
+    if transiente is None:
+        return estatico
+    transiente.set_tiempo(t)
+    campo = _evaluar(transiente, X, Y, tipo, radio_nucleo)
+    if estatico is not None:
+        campo += estatico
+    return campo
+
+
+def _dibujar(ax, X, Y, campo, tipo, niveles, t):
+    ax.clear()
+    if tipo == 'velocidad':
+        f_x, f_y = campo
+        colors = sigmoid(np.hypot(f_x, f_y) / 50)
+        ax.streamplot(X[0], Y[:, 0], f_x, f_y, color=colors, cmap='jet', density=2, linewidth=0.5, arrowstyle='->')
+    else:
+        ax.contourf(X, Y, campo, cmap='jet', levels=niveles, extend='both')
+
+    ax.set_xlim(X[0, 0], X[0, -1])
+    ax.set_ylim(Y[0, 0], Y[-1, 0])
+    ax.set_xlabel('$x$')
+    ax.set_ylabel('$y$')
+    ax.set_aspect('equal')
+    ax.set_title(f'{TITULOS[tipo]}  (t = {t:.3f})')
+
+
+def _renderizar(transiente, estatico, X, Y, tipo, radio_nucleo, niveles, tiempos, figsize, dpi):
+    # Se ejecuta en los procesos del pool: devuelve los cuadros como RGBA
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+
+    cuadros = []
+    for t in tiempos:
+        campo = _campo(transiente, estatico, X, Y, tipo, radio_nucleo, t)
+        _dibujar(ax, X, Y, campo, tipo, niveles, t)
+        canvas.draw()
+        cuadros.append(np.asarray(canvas.buffer_rgba()).copy())
+    return cuadros
+
+
+class Animacion:
+    """
+    Anima un flujo con partes transientes (ver `flujos_transientes`). La parte
+    estatica se evalua una sola vez sobre la grilla y en cada cuadro solo se
+    recalculan los terminos que dependen del tiempo.
+    """
+
+    def __init__(self, flujo: Flujo, x_lim, y_lim, tipo='corriente', nx=100, ny=100, n_niveles=20, radio_nucleo=0):
+        if tipo not in TITULOS:
+            raise ValueError(f'Tipo de grafico desconocido: {tipo}')
+
+        self.tipo = tipo
+        self.n_niveles = n_niveles
+        self.radio_nucleo = radio_nucleo
+
+        x = np.linspace(*x_lim, nx)
+        y = np.linspace(*y_lim, ny)
+        self.X, self.Y = np.meshgrid(x, y)
+
+        estatico, self.transiente = flujo.separar()
+        self.estatico = None if estatico is None else _evaluar(estatico, self.X, self.Y, tipo, radio_nucleo)
+
+    def campo(self, t):
+        return _campo(self.transiente, self.estatico, self.X, self.Y, self.tipo, self.radio_nucleo, t)
+
+    def niveles(self, tiempos, muestras=9, paso=4):
+        # Niveles comunes a toda la animacion: cubren los rangos del campo en
+        # `muestras` tiempos repartidos (incluye el primero y el ultimo), evaluado sobre una subgrilla
+        if self.tipo == 'velocidad':
+            return None
+        tiempos = np.asarray(tiempos, dtype=float).ravel()
+        indices = np.unique(np.linspace(0, len(tiempos) - 1, min(muestras, len(tiempos))).round().astype(int))
+
+        X, Y = self.X[::paso, ::paso], self.Y[::paso, ::paso]
+        estatico = None if self.estatico is None else self.estatico[::paso, ::paso]
+        rangos = [niveles(_campo(self.transiente, estatico, X, Y, self.tipo, self.radio_nucleo, tiempos[i]), 2)
+                  for i in indices]
+        return np.linspace(min(r[0] for r in rangos), max(r[-1] for r in rangos), self.n_niveles)
+
+    def guardar(self, ruta, tiempos, fps=30, writer=None, procesos=None, cuadros_por_tarea=10,
+                figsize=(6.4, 4.8), dpi=100, niveles=None):
+        # `niveles` fija los niveles de contorno; por defecto se toman de varios tiempos
+        tiempos = np.asarray(tiempos, dtype=float)
+        if niveles is None:
+            niveles = self.niveles(tiempos)
+
+        if writer is None:
+            writer = 'pillow' if ruta.lower().endswith('.gif') else 'ffmpeg'
+        if isinstance(writer, str):
+            writer = animation.writers[writer](fps=fps)
+
+        procesos = procesos or os.cpu_count() or 1
+        bloques = [tiempos[i:i + cuadros_por_tarea] for i in range(0, len(tiempos), cuadros_por_tarea)]
+        args = (self.transiente, self.estatico, self.X, self.Y, self.tipo, self.radio_nucleo, niveles)
+
+        # Figura que solo muestra los cuadros ya renderizados, para el writer
+        fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(fig)
+        ax = fig.add_axes([0, 0, 1, 1])
+        ax.set_axis_off()
+        imagen = None
+
+        with writer.saving(fig, ruta, dpi):
+            for cuadros in self._cuadros(bloques, args, procesos, figsize, dpi):
+                for cuadro in cuadros:
+                    if imagen is None:
+                        imagen = ax.imshow(cuadro, interpolation='none')
+                    else:
+                        imagen.set_data(cuadro)
+                    writer.grab_frame()
+
+    @staticmethod
+    def _cuadros(bloques, args, procesos, figsize, dpi):
+        if procesos == 1:
+            for bloque in bloques:
+                yield _renderizar(*args, bloque, figsize, dpi)
+            return
+
+        # Ventana acotada de tareas en vuelo para no acumular cuadros en memoria
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            pendientes = deque()
+            bloques = iter(bloques)
+            for bloque in bloques:
+                pendientes.append(pool.submit(_renderizar, *args, bloque, figsize, dpi))
+                if len(pendientes) >= 2 * procesos:
+                    break
+            while pendientes:
+                yield pendientes.popleft().result()
+                bloque = next(bloques, None)
+                if bloque is not None:
+                    pendientes.append(pool.submit(_renderizar, *args, bloque, figsize, dpi))
@@ -0,0 +1,202 @@
+import numpy as np
+
+
+def _unarias():
+    # ufunc -> (g, g', g'') evaluadas en a
+    def tan(a):
+        t = np.tan(a)
+        return t, 1 + t ** 2, 2 * t * (1 + t ** 2)
+
+    def tanh(a):
+        t = np.tanh(a)
+        return t, 1 - t ** 2, -2 * t * (1 - t ** 2)
+
+    def sqrt(a):
+        s = np.sqrt(a)
+        return s, 1 / (2 * s), -1 / (4 * s ** 3)
+
+    def exp(a):
+        e = np.exp(a)
+        return e, e, e
+
+    def exp2(a):
+        e = np.exp2(a)
+        return e, np.log(2) * e, np.log(2) ** 2 * e
+
+    def expm1(a):
+        e = np.exp(a)
+        return np.expm1(a), e, e
+
+    def arcsin(a):
+        d = 1 / np.sqrt(1 - a ** 2)
+        return np.arcsin(a), d, a * d ** 3
+
+    def arccos(a):
+        d = 1 / np.sqrt(1 - a ** 2)
+        return np.arccos(a), -d, -a * d ** 3
+
+    def arcsinh(a):
+        d = 1 / np.sqrt(1 + a ** 2)
+        return np.arcsinh(a), d, -a * d ** 3
+
+    def arccosh(a):
+        d = 1 / (np.sqrt(a - 1) * np.sqrt(a + 1))
+        return np.arccosh(a), d, -a * d ** 3
+
+    def arctanh(a):
+        d = 1 / (1 - a ** 2)
+        return np.arctanh(a), d, 2 * a * d ** 2
+
+    return {
+        np.exp: exp,
+        np.exp2: exp2,
+        np.expm1: expm1,
+        np.log: lambda a: (np.log(a), 1 / a, -1 / a ** 2),
+        np.log2: lambda a: (np.log2(a), 1 / (a * np.log(2)), -1 / (a ** 2 * np.log(2))),
+        np.log10: lambda a: (np.log10(a), 1 / (a * np.log(10)), -1 / (a ** 2 * np.log(10))),
+        np.log1p: lambda a: (np.log1p(a), 1 / (1 + a), -1 / (1 + a) ** 2),
+        np.square: lambda a: (a ** 2, 2 * a, 2 * np.ones_like(a)),
+        np.sqrt: sqrt,
+        np.sin: lambda a: (np.sin(a), np.cos(a), -np.sin(a)),
+        np.cos: lambda a: (np.cos(a), -np.sin(a), -np.cos(a)),
+        np.tan: tan,
+        np.sinh: lambda a: (np.sinh(a), np.cosh(a), np.sinh(a)),
+        np.cosh: lambda a: (np.cosh(a), np.sinh(a), np.cosh(a)),
+        np.tanh: tanh,
+        np.arcsin: arcsin,
+        np.arccos: arccos,
+        np.arctan: lambda a: (np.arctan(a), 1 / (1 + a ** 2), -2 * a / (1 + a ** 2) ** 2),
+        np.arcsinh: arcsinh,
+        np.arccosh: arccosh,
+        np.arctanh: arctanh,
+        np.reciprocal: lambda a: (1 / a, -1 / a ** 2, 2 / a ** 3),
+    }
+
+
+class Jet:
+    """
+    Numero dual de segundo orden (f, f', f'') para derivar en modo directo
+    funciones holomorfas escritas con NumPy. Las operaciones aritmeticas y
+    las ufuncs de `_UNARIAS` propagan las derivadas, asi que evaluar w(Jet)
+    entrega w, dw/dz y d2w/dz2 en una sola pasada vectorizada. Con d2=None
+    solo se propaga la primera derivada.
+    """
+
+    __array_priority__ = 1000
+
+    def __init__(self, f, d1, d2=None):
+        self.f = f
+        self.d1 = d1
+        self.d2 = d2
+
+    @classmethod
+    def variable(cls, z, orden=2):
+        z = np.asarray(z)
+        return cls(z, np.ones(z.shape), np.zeros(z.shape) if orden == 2 else None)
+
+    def _como_jet(self, otro):
+        if isinstance(otro, Jet):
+            return otro
+        return Jet(otro, 0, None if self.d2 is None else 0)
+
+    def _cadena(self, g, dg, d2g):
+        # Regla de la cadena para g(self)
+        d2 = None if self.d2 is None else d2g * self.d1 ** 2 + dg * self.d2
+        return Jet(g, dg * self.d1, d2)
+
+    @property
+    def shape(self):
+        return np.shape(self.f)
+
+    def __getitem__(self, indice):
+        d2 = None if self.d2 is None else np.broadcast_to(self.d2, self.shape)[indice]
+        return Jet(self.f[indice], np.broadcast_to(self.d1, self.shape)[indice], d2)
+
+    def __setitem__(self, indice, valor):
+        valor = self._como_jet(valor)
+        self.f = np.array(self.f, dtype=np.result_type(self.f, valor.f))
+        self.d1 = np.array(np.broadcast_to(self.d1, self.shape), dtype=np.result_type(self.d1, valor.d1))
+        self.f[indice] = valor.f
+        self.d1[indice] = valor.d1
+        if self.d2 is not None:
+            self.d2 = np.array(np.broadcast_to(self.d2, self.shape), dtype=np.result_type(self.d2, valor.d2))
+            self.d2[indice] = valor.d2
+
+    def __neg__(self):
+        return Jet(-self.f, -self.d1, None if self.d2 is None else -self.d2)
+
+    def __pos__(self):
+        return self
+
+    def __add__(self, otro):
+        otro = self._como_jet(otro)
+        d2 = None if self.d2 is None or otro.d2 is None else self.d2 + otro.d2
+        return Jet(self.f + otro.f, self.d1 + otro.d1, d2)
+
+    def __radd__(self, otro):
+        return self + otro
+
+    def __sub__(self, otro):
+        return self + (-self._como_jet(otro))
+
+    def __rsub__(self, otro):
+        return self._como_jet(otro) - self
+
+    def __mul__(self, otro):
+        otro = self._como_jet(otro)
+        d2 = None
+        if self.d2 is not None and otro.d2 is not None:
+            d2 = self.d2 * otro.f + 2 * self.d1 * otro.d1 + self.f * otro.d2
+        return Jet(self.f * otro.f, self.d1 * otro.f + self.f * otro.d1, d2)
+
+    def __rmul__(self, otro):
+        return self * otro
+
+    def __truediv__(self, otro):
+        if isinstance(otro, Jet):
+            return self * otro._reciproco()
+        return self * (1 / otro)
+
+    def __rtruediv__(self, otro):
+        return self._reciproco() * otro
+
+    def _reciproco(self):
+        return self._cadena(*_UNARIAS[np.reciprocal](self.f))
+
+    def __pow__(self, n):
+        if isinstance(n, Jet):
+            return np.exp(n * np.log(self))
+        if np.ndim(n) == 0 and n == 2:
+            return self * self
+        return self._cadena(self.f ** n, n * self.f ** (n - 1), n * (n - 1) * self.f ** (n - 2))
+
+    def __rpow__(self, base):
+        return np.exp(self * np.log(base))
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != '__call__' or kwargs:
+            return NotImplemented
+
+        binarias = {
+            np.add: lambda a, b: a + b,
+            np.subtract: lambda a, b: a - b,
+            np.multiply: lambda a, b: a * b,
+            np.true_divide: lambda a, b: a / b,
+            np.power: lambda a, b: a ** b,
+        }
+        if ufunc in binarias:
+            a, b = inputs
+            if not isinstance(a, Jet):
+                a = b._como_jet(a)
+            return binarias[ufunc](a, b)
+        elif ufunc is np.negative:
+            return -inputs[0]
+        elif ufunc is np.positive:
+            return inputs[0]
+        elif ufunc in _UNARIAS:
+            return inputs[0]._cadena(*_UNARIAS[ufunc](inputs[0].f))
+
+        raise TypeError(f'{ufunc.__name__} no esta soportada para derivar')
+
+
+_UNARIAS = _unarias()
@@ -0,0 +1,143 @@
+import json
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+from flujos_esenciales import Flujo
+
+
+# Puntos aproximados por bloque: acota la memoria usada al exportar grillas grandes
+TAMANO_BLOQUE = 2 ** 20
+
+
+def nombres(campos):
+    # Arreglos de salida de cada campo (la velocidad tiene dos componentes)
+    res = []
+    for campo in campos:
+        res += ['velocidad_x', 'velocidad_y'] if campo == 'velocidad' else [campo]
+    return res
+
+
+def bloques(flujo: Flujo, x_lim, y_lim, nx, ny, campos, radio_nucleo=0, filas=None):
+    """
+    Evalua la grilla por bloques de filas completas. Entrega (fila inicial,
+    X, Y, dict nombre -> arreglo) con NaN en los puntos enmascarados.
+    """
+    x = np.linspace(*x_lim, nx)
+    y = np.linspace(*y_lim, ny)
+    filas = filas or max(1, TAMANO_BLOQUE // nx)
+
+    for inicio in range(0, ny, filas):
+        X, Y = np.meshgrid(x, y[inicio:inicio + filas])
+        res = flujo.evaluar(X, Y, campos, radio_nucleo)
+        mascara = res.pop('mascara')
+
+        salida = {}
+        for campo, valor in res.items():
+            if campo == 'velocidad':
+                salida['velocidad_x'], salida['velocidad_y'] = valor
+            else:
+                salida[campo] = valor
+        yield inicio, X, Y, {k: np.where(mascara, np.nan, v) for k, v in salida.items()}
+
+
+def exportar_binario(ruta, flujo: Flujo, x_lim, y_lim, nx, ny, campos, radio_nucleo=0, filas=None):
+    """
+    Escribe los campos como un arreglo crudo float64 (campo, y, x) mapeado en
+    memoria, mas un archivo `ruta + '.json'` con la forma y los nombres.
+    Se lee con `leer_binario`.
+    """
+    columnas = nombres(campos)
+    datos = np.memmap(ruta, dtype='<f8', mode='w+', shape=(len(columnas), ny, nx))
+    for inicio, _, _, res in bloques(flujo, x_lim, y_lim, nx, ny, campos, radio_nucleo, filas):
+        for i, nombre in enumerate(columnas):
+            datos[i, inicio:inicio + len(res[nombre])] = res[nombre]
+    datos.flush()
+    del datos
+
+    with open(ruta + '.json', 'w') as f:
+        json.dump({
+            'dtype': '<f8',
+            'forma': [len(columnas), ny, nx],
+            'campos': columnas,
+            'x_lim': list(x_lim),
+            'y_lim': list(y_lim),
+        }, f, indent=2)
+    return columnas
+
+
+def leer_binario(ruta):
+    # Devuelve un dict nombre -> arreglo (ny, nx) de solo lectura, sin cargarlo en memoria
+    with open(ruta + '.json') as f:
+        meta = json.load(f)
+    datos = np.memmap(ruta, dtype=meta['dtype'], mode='r', shape=tuple(meta['forma']))
+    return dict(zip(meta['campos'], datos))
+
+
+def _escribir_npy(zf, nombre, arreglo, filas):
+    # Copia `arreglo` a una entrada .npy del zip por bloques de filas
+    with zf.open(nombre + '.npy', 'w', force_zip64=True) as f:
+        encabezado = {'descr': np.lib.format.dtype_to_descr(arreglo.dtype), 'fortran_order': False,
+                      'shape': arreglo.shape}
+        np.lib.format.write_array_header_1_0(f, encabezado)
+        for inicio in range(0, len(arreglo), filas):
+            f.write(np.ascontiguousarray(arreglo[inicio:inicio + filas]).tobytes())
+
+
+def exportar_npz(ruta, flujo: Flujo, x_lim, y_lim, nx, ny, campos, radio_nucleo=0, filas=None, comprimir=False):
+    """
+    Archivo .npz con x, y y un arreglo (ny, nx) por campo. Los bloques se
+    evaluan a un binario temporal y se copian al zip por partes, asi que la
+    grilla nunca esta completa en memoria.
+    """
+    filas = filas or max(1, TAMANO_BLOQUE // nx)
+    compresion = zipfile.ZIP_DEFLATED if comprimir else zipfile.ZIP_STORED
+
+    with tempfile.TemporaryDirectory() as directorio:
+        temporal = os.path.join(directorio, 'campos.f8')
+        exportar_binario(temporal, flujo, x_lim, y_lim, nx, ny, campos, radio_nucleo, filas)
+        datos = leer_binario(temporal)
+
+        with zipfile.ZipFile(ruta, 'w', compression=compresion, allowZip64=True) as zf:
+            _escribir_npy(zf, 'x', np.linspace(*x_lim, nx), filas)
+            _escribir_npy(zf, 'y', np.linspace(*y_lim, ny), filas)
+            for nombre, arreglo in datos.items():
+                _escribir_npy(zf, nombre, arreglo, filas)
+        del datos
+
+
+def exportar_vtk(ruta, flujo: Flujo, x_lim, y_lim, nx, ny, campos, radio_nucleo=0, filas=None, titulo='Flujo'):
+    """
+    Archivo VTK legacy binario (STRUCTURED_GRID) para ParaView. Como cada
+    seccion tiene tamano conocido, primero se escriben los encabezados y cada
+    bloque se escribe directamente en su posicion dentro de cada seccion.
+    """
+    n = nx * ny
+    # (encabezado, nombres de las componentes); None es la coordenada z = 0
+    secciones = [(f'POINTS {n} double\n', ['x', 'y', None])]
+    for i, campo in enumerate(campos):
+        prefijo = f'POINT_DATA {n}\n' if i == 0 else ''
+        if campo == 'velocidad':
+            secciones.append((f'{prefijo}VECTORS velocidad double\n', ['velocidad_x', 'velocidad_y', None]))
+        else:
+            secciones.append((f'{prefijo}SCALARS {campo} double 1\nLOOKUP_TABLE default\n', [campo]))
+
+    with open(ruta, 'wb') as f:
+        f.write(f'# vtk DataFile Version 3.0\n{titulo}\nBINARY\nDATASET STRUCTURED_GRID\n'
+                f'DIMENSIONS {nx} {ny} 1\n'.encode('ascii'))
+
+        posiciones = []
+        for encabezado, componentes in secciones:
+            f.write(encabezado.encode('ascii'))
+            posiciones.append(f.tell())
+            f.seek(n * len(componentes) * 8, os.SEEK_CUR)
+            f.write(b'\n')
+
+        for inicio, X, Y, res in bloques(flujo, x_lim, y_lim, nx, ny, campos, radio_nucleo, filas):
+            res['x'], res['y'] = X, Y
+            for posicion, (_, componentes) in zip(posiciones, secciones):
+                bloque = np.stack([res[c] if c is not None else np.zeros(X.shape) for c in componentes], axis=-1)
+                f.seek(posicion + inicio * nx * len(componentes) * 8)
+                f.write(bloque.astype('>f8').tobytes())
@@ -0,0 +1,110 @@
+import numpy as np
+import sympy as sym
+
+from flujos_esenciales import Flujo
+
+
+class FlujoAxisimetrico(Flujo):
+    """
+    Flujo axisimetrico en el plano meridional: x es la coordenada axial y
+    y la radial. `funcion` devuelve phi + i * psi, con psi la funcion de
+    corriente de Stokes, de modo que corriente, potencial, presion, la suma
+    y el producto por escalares funcionan igual que en 2D. Las velocidades
+    son (v_x, v_r).
+    """
+
+    axisimetrico = True
+
+    def __init__(self, A, x0=(0, 0), escala_input=1, rho=1):
+        super().__init__(rho)
+        if x0 is not None and x0[1] != 0:
+            raise ValueError('Los elementos axisimetricos deben estar sobre el eje (y0 = 0)')
+
+        self.A = A
+        self.x0 = 0 if x0 is None else x0[0]
+        self.escala_input = escala_input
+
+    @property
+    def singularidades(self):
+        return [complex(self.x0 / self.escala_input, 0)]
+
+    def _coordenadas(self, x, y):
+        xi = self.escala_input * x - self.x0
+        r = self.escala_input * y
+        return xi, r, np.sqrt(xi ** 2 + r ** 2)
+
+    def _coordenadas_symbolic(self):
+        xi = self.escala_input * sym.Symbol('x', real=True) - self.x0
+        r = self.escala_input * sym.Symbol('y', real=True)
+        return xi, r, sym.sqrt(xi ** 2 + r ** 2)
+
+
+class UniformAxisimetrico(FlujoAxisimetrico):
+    # phi = A x, psi = A r^2 / 2
+    def __init__(self, A, escala_input=1, rho=1, x0=None):
+        super().__init__(A, None, escala_input, rho)
+
+    @property
+    def singularidades(self):
+        return []
+
+    @property
+    def symbolic(self):
+        xi, r, _ = self._coordenadas_symbolic()
+        return self.A * xi + sym.I * self.A * r ** 2 / (2 * self.escala_input)
+
+    def funcion(self, x, y):
+        xi, r = self.escala_input * x, self.escala_input * y
+        return self.A * xi + 1j * self.A * r ** 2 / (2 * self.escala_input)
+
+    def velocidad(self, x, y):
+        shape = np.shape(x)
+        return np.full(shape, self.escala_input * self.A), np.zeros(shape)
+
+
+class FuenteAxisimetrica(FlujoAxisimetrico):
+    # Fuente puntual (caudal 4 pi A): phi = -A / d, psi = -A (x - x0) / d
+    @property
+    def symbolic(self):
+        xi, r, d = self._coordenadas_symbolic()
+        return -self.A / d - sym.I * self.A * xi / (d * self.escala_input)
+
+    def funcion(self, x, y):
+        xi, r, d = self._coordenadas(x, y)
+        return -self.A / d - 1j * self.A * xi / (d * self.escala_input)
+
+    def velocidad(self, x, y):
+        xi, r, d = self._coordenadas(x, y)
+        v = self.escala_input * self.A / d ** 3
+        return v * xi, v * r
+
+
+class DobleteAxisimetrico(FlujoAxisimetrico):
+    # phi = A (x - x0) / d^3, psi = -A r^2 / d^3
+    @property
+    def symbolic(self):
+        xi, r, d = self._coordenadas_symbolic()
+        return self.A * xi / d ** 3 - sym.I * self.A * r ** 2 / (d ** 3 * self.escala_input)
+
+    def funcion(self, x, y):
+        xi, r, d = self._coordenadas(x, y)
+        d3 = d ** 3
+        return self.A * xi / d3 - 1j * self.A * r ** 2 / (d3 * self.escala_input)
+
+    def velocidad(self, x, y):
+        xi, r, d = self._coordenadas(x, y)
+        d2 = d ** 2
+        v = self.escala_input * self.A / (d2 * d2 * d)
+        return v * (d2 - 3 * xi ** 2), -3 * v * xi * r
+
+
+def esfera(U, radio, centro=0, rho=1):
+    # Flujo uniforme alrededor de una esfera
+    return UniformAxisimetrico(U, rho=rho) + DobleteAxisimetrico(U * radio ** 3 / 2, x0=(centro, 0), rho=rho)
+
+
+def cuerpo_de_rankine(U, A, b, rho=1):
+    # Fuente en x = -b y sumidero en x = b dentro de un flujo uniforme
+    return (UniformAxisimetrico(U, rho=rho)
+            + FuenteAxisimetrica(A, x0=(-b, 0), rho=rho)
+            + FuenteAxisimetrica(-A, x0=(b, 0), rho=rho))
@@ -4,10 +4,15 @@ import sympy as sym
 
 from abc import ABC, abstractmethod
 
+from derivadas import Jet
+
 sym.init_printing()
 
 
 class Flujo(ABC):
+    # Los flujos axisimetricos usan (x, y) = (z, r) y funcion = phi + i * psi (Stokes)
+    axisimetrico = False
+
     def __init__(self, rho):
         self.initial_condition = None
         self._rho = rho
@@ -51,6 +56,19 @@ class Flujo(ABC):
         vx0, vy0 = self.velocidad(np.array([[x0]]), np.array([[y0]]))
         self.initial_condition = ((vx0[0, 0], vy0[0, 0]), P0)
 
+    @property
+    def transiente(self):
+        return False
+
+    def set_tiempo(self, t):
+        pass
+
+    def separar(self):
+        # Devuelve (parte estatica, parte transiente); alguna puede ser None
+        if self.transiente:
+            return None, self
+        return self, None
+
     @abstractmethod
     def funcion(self, x, y):
         pass
@@ -62,11 +80,13 @@ class Flujo(ABC):
         return np.real(self.funcion(x, y))
 
     def presion(self, x, y):
+        return self._presion(*self.velocidad(x, y))
+
+    def _presion(self, v_x, v_y):
         if self.initial_condition is None:
             raise Exception('Initial conditions must be set')
 
         (v0_x, v0_y), P0 = self.initial_condition
-        v_x, v_y = self.velocidad(x, y)
 
         return P0 + (self.rho / 2) * (v0_x ** 2 + v0_y ** 2 - (v_x ** 2 + v_y ** 2))
 
@@ -74,6 +94,57 @@ class Flujo(ABC):
     def velocidad(self, x, y):
         pass
 
+    @property
+    def singularidades(self):
+        # Posiciones (complejas) donde el flujo diverge
+        return []
+
+    def nucleo(self, x, y, radio):
+        mascara = np.zeros(np.shape(x), dtype=bool)
+        if radio > 0:
+            for s in self.singularidades:
+                mascara |= (x - np.real(s)) ** 2 + (y - np.imag(s)) ** 2 <= radio ** 2
+        return mascara
+
+    campos = ('corriente', 'potencial', 'velocidad', 'presion')
+
+    def evaluar(self, x, y, campos, radio_nucleo=0):
+        # Evalua varios campos a la vez: funcion y velocidad se calculan una sola
+        # vez. Devuelve un dict campo -> valor, mas 'mascara' con los nucleos de
+        # las singularidades (radio_nucleo) y los puntos con valores no finitos.
+        desconocidos = set(campos) - set(self.campos)
+        if desconocidos:
+            raise ValueError(f'Tipo de campo desconocido: {", ".join(sorted(desconocidos))}')
+
+        res = {}
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            if 'corriente' in campos or 'potencial' in campos:
+                w = self.funcion(x, y)
+                res['corriente'] = np.imag(w)
+                res['potencial'] = np.real(w)
+            if 'velocidad' in campos or 'presion' in campos:
+                v_x, v_y = self.velocidad(x, y)
+                res['velocidad'] = v_x, v_y
+                if 'presion' in campos:
+                    res['presion'] = self._presion(v_x, v_y)
+
+        res = {campo: res[campo] for campo in campos}
+        mascara = self.nucleo(x, y, radio_nucleo)
+        for valor in res.values():
+            for v in (valor if isinstance(valor, tuple) else (valor,)):
+                mascara |= ~np.isfinite(v)
+        res['mascara'] = mascara
+        return res
+
+    def campo(self, x, y, tipo, radio_nucleo=0):
+        # Evalua `tipo` como arreglo enmascarado (ver `evaluar`)
+        res = self.evaluar(x, y, [tipo], radio_nucleo)
+        mascara = res['mascara']
+        if tipo == 'velocidad':
+            v_x, v_y = res[tipo]
+            return np.ma.masked_array(v_x, mascara), np.ma.masked_array(v_y, mascara)
+        return np.ma.masked_array(res[tipo], mascara)
+
     @staticmethod
     def cartesian_to_polar(x, y):
         return np.abs(x + y * 1j), np.angle(x + y * 1j)
@@ -84,6 +155,9 @@ class Flujo(ABC):
         return np.real(z), np.imag(z)
 
     def __add__(self, other):
+        if self.axisimetrico != other.axisimetrico:
+            raise TypeError('Cannot add an axisymmetric flow to a plane flow')
+
         return Composite([self, other])
 
     def __mul__(self, other):
@@ -107,6 +181,10 @@ class Composite(Flujo):
     def rho(self):
         return self._rho
 
+    @property
+    def axisimetrico(self):
+        return any(flujo.axisimetrico for flujo in self.flujos)
+
     @property
     def symbolic(self):
         s = sym.Rational(0, 1)
@@ -120,6 +198,35 @@ class Composite(Flujo):
         for flujo in self.flujos:
             flujo.set_rho(value)
 
+    @property
+    def transiente(self):
+        return any(flujo.transiente for flujo in self.flujos)
+
+    @property
+    def singularidades(self):
+        return [s / self.escala_input for flujo in self.flujos for s in flujo.singularidades]
+
+    def set_tiempo(self, t):
+        for flujo in self.flujos:
+            flujo.set_tiempo(t)
+
+    def separar(self):
+        estaticos = []
+        transientes = []
+        for flujo in self.flujos:
+            estatico, transiente = flujo.separar()
+            if estatico is not None:
+                estaticos.append(estatico)
+            if transiente is not None:
+                transientes.append(transiente)
+
+        def componer(flujos):
+            if not flujos:
+                return None
+            return Composite(flujos, self.escala_input, self.escala_output, self._rho)
+
+        return componer(estaticos), componer(transientes)
+
     def funcion(self, x, y):
         res = np.full(x.shape, 0j)
         for flujo in self.flujos:
@@ -133,7 +240,8 @@ class Composite(Flujo):
             v_x_i, v_y_i = flujo.velocidad(self.escala_input * x, self.escala_input * y)
             v_x += v_x_i
             v_y += v_y_i
-        return self.escala_output * v_x, self.escala_output * v_y
+        escala = self.escala_output * self.escala_input
+        return escala * v_x, escala * v_y
 
 
 class Uniform(Flujo):
@@ -159,7 +267,7 @@ class Uniform(Flujo):
         return self.A * z * np.exp(-self.alpha * 1j)
 
     def velocidad(self, x, y):
-        shape = len(x), len(y)
+        shape = np.shape(x)
         vx = np.real(self.escala_input * self.A * np.cos(self.alpha))
         vy = np.real(self.escala_input * self.A * np.sin(self.alpha))
         return np.full(shape, vx), np.full(shape, vy)
@@ -172,6 +280,10 @@ class Fuente(Flujo):
         self.z0 = complex(*x0)
         self.escala_input = escala_input
 
+    @property
+    def singularidades(self):
+        return [self.z0 / self.escala_input]
+
     @property
     def symbolic(self):
         z = sym.Symbol('x', real=True) + sym.I * sym.Symbol('y', real=True)
@@ -180,16 +292,13 @@ class Fuente(Flujo):
 
     def funcion(self, x, y):
         z = self.escala_input * (x + y * 1j)
-        result = self.A * np.log(z - self.z0)
-        result[z - self.z0 == 0 + 0j] = -10**10 + 0j
-        return result
+        return self.A * np.log(z - self.z0)
 
     def velocidad(self, x, y):
         x = self.escala_input * x
         y = self.escala_input * y
         r, theta = self.cartesian_to_polar(x - np.real(self.z0), y - np.imag(self.z0))
         vr = self.escala_input * self.A / r
-        vr[r == 0] = 0
         vt = 0
 
         vx = vr * np.cos(theta) - vt * np.sin(theta)
@@ -204,6 +313,10 @@ class VorticeIrrotacional(Flujo):
         self.z0 = complex(*x0)
         self.escala_input = escala_input
 
+    @property
+    def singularidades(self):
+        return [self.z0 / self.escala_input]
+
     @property
     def symbolic(self):
         z = sym.Symbol('x', real=True) + sym.I * sym.Symbol('y', real=True)
@@ -229,6 +342,10 @@ class Doblete(Flujo):
         self.z0 = complex(*x0)
         self.escala_input = escala_input
 
+    @property
+    def singularidades(self):
+        return [self.z0 / self.escala_input]
+
     @property
     def symbolic(self):
         z = sym.Symbol('x', real=True) + sym.I * sym.Symbol('y', real=True)
@@ -250,11 +367,17 @@ class Doblete(Flujo):
 
 
 class Custom(Flujo):
-    def __init__(self, funcion, velocidad, symbolic=None, rho=1):
+    # Si no se entrega `velocidad`, se obtiene derivando `funcion` con numeros duales (ver `derivadas`)
+    def __init__(self, funcion, velocidad=None, symbolic=None, rho=1, singularidades=()):
         super().__init__(rho)
         self._funcion = funcion
         self._velocidad = velocidad
         self._symbolic = symbolic
+        self._singularidades = [complex(s) for s in singularidades]
+
+    @property
+    def singularidades(self):
+        return self._singularidades
 
     @property
     def symbolic(self):
@@ -263,5 +386,40 @@ class Custom(Flujo):
     def funcion(self, x, y):
         return self._funcion(x, y)
 
+    def derivadas(self, x, y, orden=2):
+        # dw/dz (y d2w/dz2 si orden = 2) en una sola evaluacion de `funcion`.
+        # Como w es holomorfa, dw/dz = dw/dx: basta con derivar respecto de x.
+        w = self._funcion(Jet.variable(x, orden), y)
+        if not isinstance(w, Jet):
+            w = Jet(w, 0, 0)
+        d1 = np.broadcast_to(w.d1, np.shape(x))
+        if orden == 1:
+            return d1
+        return d1, np.broadcast_to(w.d2, np.shape(x))
+
     def velocidad(self, x, y):
-        return self._velocidad(x, y)
+        if self._velocidad is not None:
+            return self._velocidad(x, y)
+
+        W = self.derivadas(x, y, orden=1)
+        return np.real(W), -np.imag(W)
+
+    def aceleracion(self, x, y):
+        # Aceleracion convectiva (V . grad) V = grad(|V|^2 / 2): a_x + i a_y = W * conj(dW/dz)
+        W, dW = self.derivadas(x, y)
+        a = W * np.conj(dW)
+        return np.real(a), np.imag(a)
+
+
+flujos = {
+    'Uniforme': Uniform,
+    'Fuente': Fuente,
+    'Vortice Irrotacional': VorticeIrrotacional,
+    'Doblete': Doblete,
+}
+
+
+def desde_props(props):
+    # Construye un flujo a partir de las propiedades de un FlowSelector
+    z0 = (props['x0'], props['y0'])
+    return props['out_scale'] * flujos[props['flow']](props['A'], escala_input=props['in_scale'], x0=z0)
@@ -0,0 +1,81 @@
+import numpy as np
+
+from flujos_esenciales import Flujo
+
+
+class Lineal:
+    # p(t) = inicial + pendiente * t. Acepta escalares o tuplas (ej. x0).
+    def __init__(self, inicial, pendiente):
+        self.inicial = inicial
+        self.pendiente = pendiente
+
+    def __call__(self, t):
+        valor = np.asarray(self.inicial) + np.asarray(self.pendiente) * t
+        return tuple(valor) if np.ndim(valor) else float(valor)
+
+
+class Oscilante:
+    # p(t) = media + amplitud * sin(omega * t + fase)
+    def __init__(self, media, amplitud, omega, fase=0):
+        self.media = media
+        self.amplitud = amplitud
+        self.omega = omega
+        self.fase = fase
+
+    def __call__(self, t):
+        valor = np.asarray(self.media) + np.asarray(self.amplitud) * np.sin(self.omega * t + self.fase)
+        return tuple(valor) if np.ndim(valor) else float(valor)
+
+
+class Transiente(Flujo):
+    """
+    Flujo cuyos parametros dependen del tiempo. Cualquier parametro de `clase`
+    puede ser un callable p(t); el resto se pasa tal cual. Ej:
+
+        Transiente(Fuente, A=1, x0=Lineal((0, 0), (1, 0)))
+        Transiente(Uniform, A=1, direction=Oscilante(0, 0.2, 2 * np.pi))
+
+    Para animar con varios procesos los callables deben ser serializables
+    (Lineal, Oscilante o funciones definidas a nivel de modulo).
+    """
+
+    def __init__(self, clase, rho=1, t=0, **parametros):
+        super().__init__(rho)
+        self.clase = clase
+        self.parametros = parametros
+        self.flujo = None
+        self.t = None
+        self.set_tiempo(t)
+
+    @property
+    def transiente(self):
+        return True
+
+    @property
+    def axisimetrico(self):
+        return self.clase.axisimetrico
+
+    @property
+    def symbolic(self):
+        return self.flujo.symbolic
+
+    @property
+    def singularidades(self):
+        return self.flujo.singularidades
+
+    def set_rho(self, rho):
+        self._rho = rho
+        self.flujo.set_rho(rho)
+
+    def set_tiempo(self, t):
+        if t == self.t:
+            return
+        parametros = {k: v(t) if callable(v) else v for k, v in self.parametros.items()}
+        self.flujo = self.clase(rho=self.rho, **parametros)
+        self.t = t
+
+    def funcion(self, x, y):
+        return self.flujo.funcion(x, y)
+
+    def velocidad(self, x, y):
+        return self.flujo.velocidad(x, y)
@@ -0,0 +1,309 @@
+import numpy as np
+import sympy as sym
+
+from abc import abstractmethod
+
+from flujos_esenciales import Flujo, Composite, Uniform, Fuente, VorticeIrrotacional, Doblete
+from flujos_transientes import Transiente
+
+
+def _conj(z):
+    if isinstance(z, sym.Basic):
+        return sym.conjugate(z)
+    return np.conj(z)
+
+
+def _z_symbolic():
+    return sym.Symbol('x', real=True) + sym.I * sym.Symbol('y', real=True)
+
+
+def _evaluar_symbolic(expr, zeta):
+    # Evalua una expresion en (x, y) sobre un punto complejo simbolico zeta
+    x, y = sym.Symbol('x', real=True), sym.Symbol('y', real=True)
+    return expr.subs({x: sym.re(zeta), y: sym.im(zeta)}, simultaneous=True)
+
+
+class Frontera(Flujo):
+    """
+    Flujo con paredes modeladas por el metodo de imagenes. Cada subclase
+    entrega sus imagenes como (M, dM, conjugar): la imagen es f(M(z)) si
+    `conjugar` es False, o conj(f(M(conj(z)))) si es True, con dM = M'.
+    """
+
+    def __init__(self, flujo: Flujo, rho=None):
+        # Las imagenes usan la conjugacion compleja, que no vale para psi de Stokes
+        if flujo.axisimetrico:
+            raise TypeError('Las fronteras por metodo de imagenes solo aplican a flujos planos')
+        super().__init__(flujo.rho if rho is None else rho)
+        self.flujo = flujo
+        self.flujo.set_rho(self._rho)
+
+    @abstractmethod
+    def imagenes(self):
+        pass
+
+    def set_rho(self, rho):
+        self._rho = rho
+        self.flujo.set_rho(rho)
+
+    @property
+    def transiente(self):
+        return self.flujo.transiente
+
+    @property
+    def axisimetrico(self):
+        return self.flujo.axisimetrico
+
+    def set_tiempo(self, t):
+        self.flujo.set_tiempo(t)
+
+    @property
+    def singularidades(self):
+        # Las imagenes anticonformes son involuciones y las rotaciones vienen en
+        # pares inversos, asi que aplicar cada imagen da todas las posiciones
+        base = self.flujo.singularidades
+        res = list(base)
+        for M, _, conjugar in self.imagenes():
+            res += [complex(M(np.conj(s)) if conjugar else M(s)) for s in base]
+        return res
+
+    @property
+    def symbolic(self):
+        base = self.flujo.symbolic
+        z = _z_symbolic()
+        s = base
+        for M, _, conjugar in self.imagenes():
+            if conjugar:
+                s += sym.conjugate(_evaluar_symbolic(base, M(sym.conjugate(z))))
+            else:
+                s += _evaluar_symbolic(base, M(z))
+        return s
+
+    def funcion(self, x, y):
+        z = x + y * 1j
+        res = self.flujo.funcion(x, y)
+        for M, _, conjugar in self.imagenes():
+            zeta = M(np.conj(z)) if conjugar else M(z)
+            w = self.flujo.funcion(np.real(zeta), np.imag(zeta))
+            res = res + (np.conj(w) if conjugar else w)
+        return res
+
+    def velocidad(self, x, y):
+        # Se trabaja con la velocidad compleja W = dw/dz = v_x - i v_y
+        z = x + y * 1j
+        v_x, v_y = self.flujo.velocidad(x, y)
+        W = v_x - 1j * v_y
+        for M, dM, conjugar in self.imagenes():
+            s = np.conj(z) if conjugar else z
+            zeta = M(s)
+            v_x_i, v_y_i = self.flujo.velocidad(np.real(zeta), np.imag(zeta))
+            W_i = dM(s) * (v_x_i - 1j * v_y_i)
+            W = W + (np.conj(W_i) if conjugar else W_i)
+        return np.real(W), -np.imag(W)
+
+
+class Pared(Frontera):
+    # Pared plana que pasa por `punto` con inclinacion `angulo` (radianes)
+    def __init__(self, flujo, punto=(0, 0), angulo=0, rho=None):
+        super().__init__(flujo, rho)
+        self.punto = complex(*punto)
+        self.angulo = angulo
+
+    def imagenes(self):
+        p = self.punto
+        e = np.exp(2j * self.angulo)
+        return [(lambda s: p + e * (s - np.conj(p)), lambda s: e, True)]
+
+
+class Esquina(Frontera):
+    # Esquina de angulo pi / n con vertice en `vertice`; la primera pared tiene inclinacion `angulo`
+    def __init__(self, flujo, n, vertice=(0, 0), angulo=0, rho=None):
+        if not isinstance(n, int) or n < 1:
+            raise ValueError('El angulo de la esquina debe ser pi / n con n entero positivo')
+
+        super().__init__(flujo, rho)
+        self.n = n
+        self.vertice = complex(*vertice)
+        self.angulo = angulo
+
+    def imagenes(self):
+        p = self.vertice
+        res = []
+        for k in range(1, self.n):
+            e = np.exp(-2j * np.pi * k / self.n)
+            res.append((lambda s, e=e: p + e * (s - p), lambda s, e=e: e, False))
+        for k in range(self.n):
+            e = np.exp(2j * (self.angulo + np.pi * k / self.n))
+            res.append((lambda s, e=e: p + e * (s - np.conj(p)), lambda s, e=e: e, True))
+        return res
+
+
+class Cilindro(Frontera):
+    # Teorema del circulo (Milne-Thomson): w = f(z) + conj(f(c + R^2 / conj(z - c)))
+    def __init__(self, flujo, radio, centro=(0, 0), rho=None):
+        super().__init__(flujo, rho)
+        self.radio = radio
+        self.centro = complex(*centro)
+
+    def imagenes(self):
+        c = self.centro
+        R2 = self.radio ** 2
+        return [(lambda s: c + R2 / (s - _conj(c)), lambda s: -R2 / (s - _conj(c)) ** 2, True)]
+
+
+def _elementos(flujo, escala_input=1, escala_output=1):
+    # Aplana un Composite en (elemento, escala_input, escala_output) efectivos.
+    # Un Transiente se reemplaza por el flujo de su tiempo actual.
+    if isinstance(flujo, Transiente):
+        return _elementos(flujo.flujo, escala_input, escala_output)
+    if isinstance(flujo, Composite):
+        res = []
+        for f in flujo.flujos:
+            res += _elementos(f, escala_input * flujo.escala_input, escala_output * flujo.escala_output)
+        return res
+    return [(flujo, escala_input, escala_output)]
+
+
+def _log_sinh(u):
+    # log(sinh(u)) sin overflow cuando |Re(u)| es grande
+    signo = np.where(np.real(u) < 0, -1, 1)
+    v = signo * u
+    return v + np.log1p(-np.exp(-2 * v)) - np.log(2) + np.where(signo < 0, 1j * np.pi, 0)
+
+
+def _coth(u):
+    signo = np.where(np.real(u) < 0, -1, 1)
+    e = np.exp(-2 * signo * u)
+    return signo * (1 + e) / (1 - e)
+
+
+def _csch2(u):
+    e = np.exp(-2 * np.where(np.real(u) < 0, -1, 1) * u)
+    return 4 * e / (1 - e) ** 2
+
+
+class Canal(Frontera):
+    """
+    Canal entre las paredes y = y0 e y = y0 + ancho. Las imagenes forman una
+    serie periodica de periodo 2 * ancho en y, que para Fuente,
+    VorticeIrrotacional y Doblete se suma en forma cerrada:
+
+        sum_k log(z - z0 - 2ihk) = log(sinh(pi (z - z0) / 2h))
+        sum_k 1 / (z - z0 - 2ihk) = pi / 2h * coth(pi (z - z0) / 2h)
+
+    Para otros flujos se trunca la serie en +-n_imagenes sumando las imagenes
+    de a pares simetricos. La cola de la serie va como 1 / N, asi que se
+    corrige con dos pasos de Richardson sobre las sumas parciales en N / 4,
+    N / 2 y N (error O(1 / N^3) para imagenes que decaen como 1 / z). Un
+    flujo Uniforme solo puede ser paralelo a las
+    paredes y se deja pasar sin imagenes.
+    """
+
+    def __init__(self, flujo, ancho, y0=0, n_imagenes=50, rho=None):
+        super().__init__(flujo, rho)
+        self.ancho = ancho
+        self.y0 = y0
+        self.n_imagenes = n_imagenes
+
+        for elemento, _, _ in _elementos(flujo):
+            if isinstance(elemento, Uniform) and not np.isclose(np.sin(elemento.alpha), 0):
+                raise ValueError('Un flujo uniforme dentro de un canal debe ser paralelo a las paredes')
+
+    @property
+    def periodo(self):
+        return 2 * self.ancho
+
+    def imagenes(self):
+        y0 = self.y0
+        return [(lambda s: s + 2j * y0, lambda s: 1, True)]
+
+    @staticmethod
+    def _singularidad(elemento, escala_input, escala_output):
+        # (tipo, posicion, intensidad) de los elementos con forma cerrada
+        if not isinstance(elemento, (Fuente, VorticeIrrotacional, Doblete)):
+            return None
+        escala = escala_input * elemento.escala_input
+        zs = elemento.z0 / escala
+        if isinstance(elemento, Fuente):
+            return 'log', zs, escala_output * elemento.A
+        elif isinstance(elemento, VorticeIrrotacional):
+            return 'log', zs, -1j * escala_output * elemento.A
+        return 'polo', zs, escala_output * elemento.A / escala
+
+    def _periodico(self, zeta, derivada):
+        # Suma periodica de todos los elementos evaluada en zeta (w o dw/dz)
+        k = np.pi / self.periodo
+        res = np.zeros(np.shape(zeta), dtype=complex)
+        for elemento, escala_input, escala_output in _elementos(self.flujo):
+            if isinstance(elemento, Uniform):
+                continue
+
+            singularidad = self._singularidad(elemento, escala_input, escala_output)
+            if singularidad is not None:
+                tipo, zs, B = singularidad
+                u = k * (zeta - zs)
+                if tipo == 'log':
+                    res += B * k * _coth(u) if derivada else B * _log_sinh(u)
+                else:
+                    res += -B * k ** 2 * _csch2(u) if derivada else B * k * _coth(u)
+                continue
+
+            def imagen(n):
+                zn = (zeta + 1j * self.periodo * n) * escala_input
+                if derivada:
+                    v_x, v_y = elemento.velocidad(np.real(zn), np.imag(zn))
+                    return escala_output * escala_input * (v_x - 1j * v_y)
+                return escala_output * elemento.funcion(np.real(zn), np.imag(zn))
+
+            # Sumas parciales en M, 2M y 4M (4M <= n_imagenes) para extrapolar la cola
+            M = self.n_imagenes // 4
+            suma = imagen(0)
+            parciales = []
+            for n in range(1, (4 * M if M else self.n_imagenes) + 1):
+                suma = suma + imagen(n) + imagen(-n)
+                if M and n in (M, 2 * M):
+                    parciales.append(suma)
+            if M:
+                # Richardson: S_N = S + a / N + b / N^2 + ...
+                s1, s2 = parciales
+                r1, r2 = 2 * s2 - s1, 2 * suma - s2
+                suma = (4 * r2 - r1) / 3
+            res += suma
+        return res
+
+    def _uniforme(self, z, derivada):
+        res = 0
+        for elemento, escala_input, escala_output in _elementos(self.flujo):
+            if isinstance(elemento, Uniform):
+                U = escala_output * escala_input * elemento.escala_input * elemento.A * np.cos(elemento.alpha)
+                res = res + (U if derivada else U * z)
+        return res
+
+    @property
+    def symbolic(self):
+        z = _z_symbolic()
+        zr = sym.conjugate(z) + 2 * sym.I * self.y0
+        k = sym.pi / self.periodo
+        s = self._uniforme(z, False)
+        for elemento, escala_input, escala_output in _elementos(self.flujo):
+            if isinstance(elemento, Uniform):
+                continue
+            singularidad = self._singularidad(elemento, escala_input, escala_output)
+            if singularidad is None:
+                raise TypeError('Solo Fuente, VorticeIrrotacional y Doblete tienen forma cerrada')
+            tipo, zs, B = singularidad
+            for zeta, conjugar in ((z, False), (zr, True)):
+                termino = B * (sym.log(sym.sinh(k * (zeta - zs))) if tipo == 'log' else k * sym.coth(k * (zeta - zs)))
+                s += sym.conjugate(termino) if conjugar else termino
+        return s
+
+    def funcion(self, x, y):
+        z = x + y * 1j
+        zr = np.conj(z) + 2j * self.y0
+        return self._uniforme(z, False) + self._periodico(z, False) + np.conj(self._periodico(zr, False))
+
+    def velocidad(self, x, y):
+        z = x + y * 1j
+        zr = np.conj(z) + 2j * self.y0
+        W = self._uniforme(z, True) + self._periodico(z, True) + np.conj(self._periodico(zr, True))
+        return np.real(W), -np.imag(W)
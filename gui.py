@@ -8,15 +8,10 @@ from matplotlib.backend_bases import key_press_handler
 from matplotlib.figure import Figure
 import numpy as np
 from flujos_esenciales import *
+from plotter import niveles
+from raster import VistaRaster
 import sympy as sym
 
-flujos = {
-    'Uniforme': Uniform,
-    'Fuente': Fuente,
-    'Vortice Irrotacional': VorticeIrrotacional,
-    'Doblete': Doblete,
-}
-
 
 def sigmoid(x):
     return 1 / (1 + np.exp(-x))
@@ -39,6 +34,8 @@ class MainScreen:
         self.flows = [flow_selector.FlowSelector(self.flowFrame, self.choices, row=1, first=True)]
 
         self.plt = None
+        # (VistaRaster, canvas, X, Y) del grafico raster en pantalla
+        self.raster = None
 
         self.plot_type = StringVar(self.window)
         self.plot_type.set('velocidad')
@@ -56,11 +53,8 @@ class MainScreen:
 
     def show_eq(self):
         def onClick(*args):
-            plot_type = self.plot_type.get()
-            flujo = self.getFlow(self.flows[0].props)
-            if len(self.flows) > 1:
-                for f in self.flows[1:]:
-                    flujo += self.getFlow(f.props)
+            plot_type = self.plot_type.get().split(' ')[0]
+            flujo = self.buildFlow()
 
             if plot_type == 'velocidad':
                 s = flujo.velocidad_symbolic
@@ -72,8 +66,7 @@ class MainScreen:
                 s = flujo.potencial_symbolic
                 base_txt = '\\phi(x,y)='
             elif plot_type == 'presion':
-                init_conds = self.initConds.props
-                flujo.set_initial_conditions(init_conds['x0'], init_conds['y0'], init_conds['P0'])
+                self.setInitialConditions(flujo)
                 base_txt = 'P(x,y)='
                 s = flujo.presion_symbolic
 
@@ -108,7 +101,8 @@ class MainScreen:
         typeFrame = Frame(self.window)
         typeFrame.grid(column=0, row=1)
         Label(typeFrame, text='Tipo de grafico:').grid(column=0, row=1)
-        popupMenu = OptionMenu(typeFrame, self.plot_type, *['velocidad', 'corriente', 'potencial', 'presion'])
+        popupMenu = OptionMenu(typeFrame, self.plot_type, *['velocidad', 'corriente', 'potencial', 'presion',
+                                                                'velocidad (raster)', 'presion (raster)'])
         popupMenu.grid(column=1, row=1)
 
     def add(self):
@@ -134,6 +128,8 @@ class MainScreen:
             plot_type = self.plot_type.get()
             if plot_type == 'velocidad':
                 self.plotSpeed()
+            elif plot_type.endswith('(raster)'):
+                self.plotRaster(plot_type.split(' ')[0])
             else:
                 self.plotLevel(plot_type)
 
@@ -143,45 +139,44 @@ class MainScreen:
 
     @staticmethod
     def getFlow(props):
-        z0 = (props['x0'], props['y0'])
-        return props['out_scale'] * flujos[props['flow']](props['A'], escala_input=props['in_scale'], x0=z0)
-
-    def plotSpeed(self):
-        if self.plt is not None:
-            self.plt.destroy()
+        return desde_props(props)
 
+    def buildFlow(self):
         flujo = self.getFlow(self.flows[0].props)
-        if len(self.flows) > 1:
-            for f in self.flows[1:]:
-                flujo += self.getFlow(f.props)
-
-        frame = Frame(self.window)
+        for f in self.flows[1:]:
+            flujo += self.getFlow(f.props)
+        return flujo
 
-        fig = Figure(figsize=(5, 4), dpi=100)
-
-        nx = 64
-        ny = 64
-        x = np.linspace(-10, 10, nx)
-        y = np.linspace(-10, 10, ny)
+    def setInitialConditions(self, flujo):
+        init_conds = self.initConds.props
+        flujo.set_initial_conditions(init_conds['x0'], init_conds['y0'], init_conds['P0'])
 
+    @staticmethod
+    def grid(lim, n):
+        x = np.linspace(*lim, n)
+        y = np.linspace(*lim, n)
         X, Y = np.meshgrid(x, y)
+        return x, y, X, Y
 
-        f_x, f_y = flujo.velocidad(X, Y)
+    def newFigure(self):
+        if self.plt is not None:
+            self.plt.destroy()
+        self.raster = None
 
+        fig = Figure(figsize=(5, 4), dpi=100)
         ax = fig.add_subplot(111)
+        return fig, ax
 
-        colors = sigmoid(np.hypot(f_x, f_y) / 50)
-
-        # ax.quiver(x, y, f_x, f_y, colors, scale=64, linewidth=1, cmap='jet', pivot='mid')
-        ax.streamplot(x, y, f_x, f_y, color=colors, cmap='jet', density=2, linewidth=0.5, arrowstyle='->')
-
+    def showFigure(self, fig, ax, title):
         ax.set_xlabel('$x$')
         ax.set_ylabel('$y$')
         ax.set_aspect('equal')
-        ax.set_title('Campo de Velocidades')
+        ax.set_title(title)
         ax.set_xlim((-5, 5))
         ax.set_ylim((-5, 5))
 
+        frame = Frame(self.window)
+
         canvas = FigureCanvasTkAgg(fig, master=frame)
         canvas.draw()
         canvas.get_tk_widget().pack(side=tkinter.TOP, fill=tkinter.BOTH, expand=1)
@@ -190,11 +185,7 @@ class MainScreen:
         toolbar.update()
         canvas.get_tk_widget().pack(side=tkinter.TOP, fill=tkinter.BOTH, expand=1)
 
-        def on_key_press(event):
-            print("you pressed {}".format(event.key))
-            key_press_handler(event, canvas, toolbar)
-
-        canvas.mpl_connect("key_press_event", on_key_press)
+        canvas.mpl_connect("key_press_event", lambda event: key_press_handler(event, canvas, toolbar))
 
         def _quit():
             self.window.quit()     # stops mainloop
@@ -207,75 +198,65 @@ class MainScreen:
         frame.grid(row=3, column=0)
 
         self.plt = frame
+        return canvas
 
-    def plotLevel(self, f_type):
-        if self.plt is not None:
-            self.plt.destroy()
-
-        flujo = self.getFlow(self.flows[0].props)
-        if len(self.flows) > 1:
-            for f in self.flows[1:]:
-                flujo += self.getFlow(f.props)
-
-        frame = Frame(self.window)
-
-        fig = Figure(figsize=(5, 4), dpi=100)
-
-        nx = 100
-        ny = 100
-        x = np.linspace(-10, 10, nx)
-        y = np.linspace(-10, 10, ny)
-
-        X, Y = np.meshgrid(x, y)
-
-        if f_type == 'potencial':
-            z = flujo.potencial(X, Y)
-        elif f_type == 'corriente':
-            z = flujo.corriente(X, Y)
-        else:
-            init_conds = self.initConds.props
-            flujo.set_initial_conditions(init_conds['x0'], init_conds['y0'], init_conds['P0'])
-            z = flujo.presion(X, Y)
-
-        ax = fig.add_subplot(111)
+    def plotSpeed(self):
+        flujo = self.buildFlow()
+        fig, ax = self.newFigure()
 
-        z[z < -1000000] = -1000000
-        levels = np.linspace(np.min(z), np.max(z), 20)
+        x, y, X, Y = self.grid((-10, 10), 64)
+        f_x, f_y = flujo.campo(X, Y, 'velocidad')
 
-        ax.contour(x, y, z, cmap='jet', levels=levels)
+        colors = sigmoid(np.hypot(f_x, f_y) / 50)
 
-        ax.set_xlabel('$x$')
-        ax.set_ylabel('$y$')
-        ax.set_aspect('equal')
-        ax.set_title(f_type)
-        ax.set_xlim((-5, 5))
-        ax.set_ylim((-5, 5))
+        # ax.quiver(x, y, f_x, f_y, colors, scale=64, linewidth=1, cmap='jet', pivot='mid')
+        ax.streamplot(x, y, f_x, f_y, color=colors, cmap='jet', density=2, linewidth=0.5, arrowstyle='->')
 
-        canvas = FigureCanvasTkAgg(fig, master=frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(side=tkinter.TOP, fill=tkinter.BOTH, expand=1)
+        self.showFigure(fig, ax, 'Campo de Velocidades')
 
-        toolbar = NavigationToolbar2Tk(canvas, frame)
-        toolbar.update()
-        canvas.get_tk_widget().pack(side=tkinter.TOP, fill=tkinter.BOTH, expand=1)
-
-        def on_key_press(event):
-            print("you pressed {}".format(event.key))
-            key_press_handler(event, canvas, toolbar)
+    def plotLevel(self, f_type):
+        flujo = self.buildFlow()
+        fig, ax = self.newFigure()
 
-        canvas.mpl_connect("key_press_event", on_key_press)
+        x, y, X, Y = self.grid((-10, 10), 100)
+        if f_type == 'presion':
+            self.setInitialConditions(flujo)
+        z = flujo.campo(X, Y, f_type)
 
-        def _quit():
-            self.window.quit()     # stops mainloop
-            self.window.destroy()  # this is necessary on Windows to prevent
-            # Fatal Python Error: PyEval_RestoreThread: NULL tstate
+        ax.contour(x, y, z, cmap='jet', levels=niveles(z))
 
-        button = Button(master=frame, text="Quit", command=_quit)
-        button.pack(side=tkinter.BOTTOM)
+        self.showFigure(fig, ax, f_type)
 
-        frame.grid(row=3, column=0)
+    def plotRaster(self, f_type):
+        # La vista raster se mantiene entre evaluaciones: solo se reemplazan los
+        # datos de la imagen y la textura LIC se reutiliza si la direccion no cambia
+        flujo = self.buildFlow()
+        if f_type == 'velocidad':
+            title = 'Campo de Velocidades'
+        else:
+            self.setInitialConditions(flujo)
+            title = 'Campo de Presiones'
+
+        if self.raster is None:
+            fig, ax = self.newFigure()
+            vista = VistaRaster(ax, (-5, 5), (-5, 5))
+            X, Y = self.grid((-5, 5), 1000)[2:]
+            self.draw(vista, flujo, f_type, X, Y)
+            fig.colorbar(vista.mapeable, ax=ax)
+            canvas = self.showFigure(fig, ax, title)
+            self.raster = (vista, canvas, X, Y)
+        else:
+            vista, canvas, X, Y = self.raster
+            self.draw(vista, flujo, f_type, X, Y)
+            vista.ax.set_title(title)
+            canvas.draw_idle()
 
-        self.plt = frame
+    @staticmethod
+    def draw(vista, flujo, f_type, X, Y):
+        if f_type == 'velocidad':
+            vista.velocidad(*flujo.campo(X, Y, 'velocidad'))
+        else:
+            vista.escalar(flujo.campo(X, Y, 'presion'))
 
 
 window = MainScreen()
@@ -0,0 +1,194 @@
+import numpy as np
+
+from abc import ABC, abstractmethod
+
+from flujos_esenciales import Flujo, Uniform, VorticeIrrotacional
+from fronteras import Cilindro
+
+
+class Mapeo(ABC):
+    """
+    Transformacion conforme z = T(zeta) del plano del circulo (zeta) al plano
+    fisico (z). El circulo de centro `centro` y radio `radio` es el cuerpo en
+    el plano zeta; su exterior se mapea al exterior del cuerpo en z.
+    """
+
+    # Cantidad de grillas cuya inversa se guarda
+    tamano_cache = 4
+
+    def __init__(self, centro, radio):
+        self.centro = complex(*centro)
+        self.radio = radio
+        self._cache = []
+
+    @abstractmethod
+    def directo(self, zeta):
+        pass
+
+    @abstractmethod
+    def derivada(self, zeta):
+        pass
+
+    @abstractmethod
+    def candidatos(self, z):
+        # Arreglo (k, ...) con todas las preimagenes posibles de z
+        pass
+
+    def contorno(self, n=360):
+        # Superficie del cuerpo en el plano fisico (imagen del circulo)
+        theta = np.linspace(0, 2 * np.pi, n, endpoint=False)
+        z = self.directo(self.centro + self.radio * np.exp(1j * theta))
+        return np.real(z), np.imag(z)
+
+    def inverso(self, x, y):
+        for cx, cy, zeta in self._cache:
+            if (cx is x and cy is y) or (cx.shape == np.shape(x) and np.array_equal(cx, x) and np.array_equal(cy, y)):
+                return zeta
+
+        zeta = self._invertir(x + y * 1j)
+        self._cache = [(np.array(x), np.array(y), zeta)] + self._cache[:self.tamano_cache - 1]
+        return zeta
+
+    def _invertir(self, z):
+        # Rama: la preimagen fuera del circulo que mejor reproduce z.
+        # Los puntos dentro del cuerpo no tienen preimagen y quedan como NaN.
+        candidatos = self.candidatos(z)
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            error = np.abs(self.directo(candidatos) - z)
+        afuera = np.abs(candidatos - self.centro) >= self.radio * (1 - 1e-12)
+        valido = afuera & (error <= 1e-8 * (1 + np.abs(z)))
+        error = np.where(valido, error, np.inf)
+
+        k = np.argmin(error, axis=0)
+        zeta = np.take_along_axis(candidatos, k[np.newaxis], axis=0)[0]
+        zeta[np.isinf(np.min(error, axis=0))] = np.nan
+        return zeta
+
+
+class KarmanTrefftz(Mapeo):
+    # z = n c ((zeta + c)^n + (zeta - c)^n) / ((zeta + c)^n - (zeta - c)^n), n = 2 - angulo_borde / pi
+    def __init__(self, c=1, n=1.9, centro=(-0.1, 0.1), radio=None):
+        super().__init__(centro, abs(c - complex(*centro)) if radio is None else radio)
+        self.c = c
+        self.n = n
+
+    @property
+    def borde_de_fuga(self):
+        return self.c
+
+    def directo(self, zeta):
+        # Con el cociente r = ((zeta - c) / (zeta + c))^n se usa una sola rama,
+        # la misma que en `candidatos`; elevar cada factor por separado hace que
+        # un -0j en el eje real caiga en lados distintos del corte
+        n, c = self.n, self.c
+        r = ((zeta - c) / (zeta + c)) ** n
+        return n * c * (1 + r) / (1 - r)
+
+    def derivada(self, zeta):
+        n, c = self.n, self.c
+        r = ((zeta - c) / (zeta + c)) ** n
+        return 4 * n ** 2 * c ** 2 * r / ((zeta - c) * (zeta + c) * (1 - r) ** 2)
+
+    def candidatos(self, z):
+        n, c = self.n, self.c
+        q = ((z - n * c) / (z + n * c)) ** (1 / n)
+        ramas = np.exp(2j * np.pi * np.arange(-1, 2) / n)
+        p = ramas.reshape((-1,) + (1,) * np.ndim(z)) * q
+        return c * (1 + p) / (1 - p)
+
+
+class Joukowski(KarmanTrefftz):
+    # z = zeta + c^2 / zeta
+    def __init__(self, c=1, centro=(-0.1, 0.1), radio=None):
+        super().__init__(c, 2, centro, radio)
+
+    def directo(self, zeta):
+        return zeta + self.c ** 2 / zeta
+
+    def derivada(self, zeta):
+        return 1 - self.c ** 2 / zeta ** 2
+
+    def candidatos(self, z):
+        s = np.sqrt(z ** 2 - 4 * self.c ** 2)
+        return np.stack(((z + s) / 2, (z - s) / 2))
+
+
+class FlujoMapeado(Flujo):
+    """
+    Flujo definido en el plano zeta y evaluado en el plano fisico:
+    w(z) = f(T^-1(z)) y dw/dz = f'(zeta) / T'(zeta).
+    """
+
+    def __init__(self, flujo: Flujo, mapa: Mapeo, rho=None):
+        # Un mapeo conforme solo transforma flujos planos
+        if flujo.axisimetrico:
+            raise TypeError('Los mapeos conformes solo aplican a flujos planos')
+        super().__init__(flujo.rho if rho is None else rho)
+        self.flujo = flujo
+        self.mapa = mapa
+        self.flujo.set_rho(self._rho)
+
+    def set_rho(self, rho):
+        self._rho = rho
+        self.flujo.set_rho(rho)
+
+    @property
+    def axisimetrico(self):
+        return self.flujo.axisimetrico
+
+    @property
+    def singularidades(self):
+        # Solo las que quedan fuera del cuerpo
+        m = self.mapa
+        return [complex(m.directo(s)) for s in self.flujo.singularidades if abs(s - m.centro) > m.radio]
+
+    def funcion(self, x, y):
+        zeta = self.mapa.inverso(x, y)
+        return self.flujo.funcion(np.real(zeta), np.imag(zeta))
+
+    def velocidad(self, x, y):
+        zeta = self.mapa.inverso(x, y)
+        v_x, v_y = self.flujo.velocidad(np.real(zeta), np.imag(zeta))
+        W = (v_x - 1j * v_y) / self.mapa.derivada(zeta)
+        return np.real(W), -np.imag(W)
+
+
+class Perfil(FlujoMapeado):
+    """
+    Flujo alrededor del perfil que genera `mapa`, con corriente libre U y
+    angulo de ataque alpha. La circulacion se fija con la condicion de Kutta
+    (punto de estancamiento en el borde de fuga).
+    """
+
+    def __init__(self, mapa: KarmanTrefftz, U=1, alpha=0, rho=1):
+        self.U = U
+        self.alpha = None
+        self.A = None
+        super().__init__(self._flujo_circulo(mapa, U, alpha, rho), mapa, rho)
+        self.alpha = alpha
+
+    def _flujo_circulo(self, mapa, U, alpha, rho):
+        circulo = Cilindro(Uniform(U, direction=float(alpha), rho=rho), mapa.radio, (mapa.centro.real, mapa.centro.imag))
+
+        # Kutta: W(borde) - i A / (borde - centro) = 0
+        borde = np.array([mapa.borde_de_fuga])
+        v_x, v_y = circulo.velocidad(np.real(borde), np.imag(borde))
+        d = borde[0] - mapa.centro
+        self.A = float(np.real(-1j * (v_x[0] - 1j * v_y[0]) * d))
+
+        return circulo + VorticeIrrotacional(self.A, x0=(mapa.centro.real, mapa.centro.imag), rho=rho)
+
+    def set_alpha(self, alpha):
+        # La inversa del mapeo queda en cache, asi que barrer alpha solo reevalua el flujo
+        self.flujo = self._flujo_circulo(self.mapa, self.U, alpha, self._rho)
+        self.alpha = alpha
+
+    @property
+    def circulacion(self):
+        # Positiva en sentido antihorario
+        return 2 * np.pi * self.A
+
+    @property
+    def sustentacion(self):
+        # Kutta-Joukowski, por unidad de envergadura
+        return -self.rho * self.U * self.circulacion
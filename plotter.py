@@ -1,13 +1,28 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from flujos_esenciales import Flujo
+import superficie
+import raster
 
 
 def sigmoid(x):
     return 1 / (1 + np.exp(-x))
 
 
-def campo_de_velocidades(x_lim, y_lim, flujo: Flujo):
+def niveles(z, n=20, percentiles=(1, 99)):
+    # Niveles entre percentiles de los valores validos (no enmascarados ni infinitos)
+    lo, hi = raster.rango(z, percentiles)
+    if lo == hi:
+        lo, hi = lo - 1, hi + 1
+    return np.linspace(lo, hi, n)
+
+
+def eje_y(flujo: Flujo):
+    # En flujos axisimetricos el eje y es la coordenada radial
+    return '$r$' if flujo.axisimetrico else '$y$'
+
+
+def campo_de_velocidades(x_lim, y_lim, flujo: Flujo, radio_nucleo=0):
     nx = 64
     ny = 64
     x = np.linspace(*x_lim, nx)
@@ -15,7 +30,7 @@ def campo_de_velocidades(x_lim, y_lim, flujo: Flujo):
 
     X, Y = np.meshgrid(x, y)
 
-    f_x, f_y = flujo.velocidad(X, Y)
+    f_x, f_y = flujo.campo(X, Y, 'velocidad', radio_nucleo)
 
     fig = plt.figure()
     ax = fig.add_subplot(111)
@@ -26,20 +41,17 @@ def campo_de_velocidades(x_lim, y_lim, flujo: Flujo):
     ax.streamplot(x, y, f_x, f_y, color=colors, cmap='jet', density=2, linewidth=0.5, arrowstyle='->')
 
     ax.set_xlabel('$x$')
-    ax.set_ylabel('$y$')
+    ax.set_ylabel(eje_y(flujo))
     ax.set_aspect('equal')
     ax.set_title('Campo de Velocidades')
     plt.show()
 
 
-def contour(x, y, z, title='', units=None):
-    z[z < -1000000] = -1000000
-    levels = np.linspace(np.min(z), np.max(z), 20)
-
+def contour(x, y, z, title='', units=None, ylabel='$y$'):
     fig = plt.figure()
     ax = fig.add_subplot(111)
 
-    cp = ax.contourf(x, y, z, cmap='jet', levels=levels)
+    cp = ax.contourf(x, y, z, cmap='jet', levels=niveles(z), extend='both')
     try:
         clb = fig.colorbar(cp)  # Add a colorbar to a plot
         if units is not None:
@@ -48,13 +60,13 @@ def contour(x, y, z, title='', units=None):
         pass
 
     ax.set_xlabel('$x$')
-    ax.set_ylabel('$y$')
+    ax.set_ylabel(ylabel)
     ax.set_aspect('equal')
     ax.set_title(title)
     plt.show()
 
 
-def lineas_de_corriente(x_lim, y_lim, flujo: Flujo):
+def lineas_de_corriente(x_lim, y_lim, flujo: Flujo, radio_nucleo=0):
     nx = 100
     ny = 100
     x = np.linspace(*x_lim, nx)
@@ -62,12 +74,12 @@ def lineas_de_corriente(x_lim, y_lim, flujo: Flujo):
 
     X, Y = np.meshgrid(x, y)
 
-    z = flujo.corriente(X, Y)
+    z = flujo.campo(X, Y, 'corriente', radio_nucleo)
 
-    contour(X, Y, z, 'Lineas de Corriente')
+    contour(X, Y, z, 'Lineas de Corriente', ylabel=eje_y(flujo))
 
 
-def lineas_de_potencial(x_lim, y_lim, flujo: Flujo):
+def lineas_de_potencial(x_lim, y_lim, flujo: Flujo, radio_nucleo=0):
     nx = 100
     ny = 100
     x = np.linspace(*x_lim, nx)
@@ -75,12 +87,12 @@ def lineas_de_potencial(x_lim, y_lim, flujo: Flujo):
 
     X, Y = np.meshgrid(x, y)
 
-    z = flujo.potencial(X, Y)
+    z = flujo.campo(X, Y, 'potencial', radio_nucleo)
 
-    contour(X, Y, z, 'Lineas de Potencial')
+    contour(X, Y, z, 'Lineas de Potencial', ylabel=eje_y(flujo))
 
 
-def campo_de_presiones(x_lim, y_lim, flujo: Flujo):
+def campo_de_presiones(x_lim, y_lim, flujo: Flujo, radio_nucleo=0):
     nx = 100
     ny = 100
     x = np.linspace(*x_lim, nx)
@@ -88,6 +100,74 @@ def campo_de_presiones(x_lim, y_lim, flujo: Flujo):
 
     X, Y = np.meshgrid(x, y)
 
-    z = flujo.presion(X, Y)
+    z = flujo.campo(X, Y, 'presion', radio_nucleo)
+
+    contour(X, Y, z, 'Campo de Presiones', units='Presión (Pa)', ylabel=eje_y(flujo))
+
+
+def coeficiente_de_presion(x, y, flujo: Flujo, v_ref=None, eje='theta', centro=None):
+    d = superficie.distribucion(flujo, x, y, v_ref, centro)
+
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+
+    if eje == 'theta':
+        orden = np.argsort(d.theta)
+        ax.plot(np.degrees(d.theta[orden]), d.Cp[orden])
+        ax.set_xlabel(r'$\theta$ (°)')
+    else:
+        ax.plot(d.s, d.Cp)
+        ax.set_xlabel('$s$')
+
+    ax.set_ylabel('$C_p$')
+    ax.grid(True)
+    ax.set_title('Coeficiente de Presión')
+    plt.show()
+
+
+def _raster(x_lim, y_lim, n, flujo: Flujo, title, vista=None):
+    x = np.linspace(*x_lim, n)
+    y = np.linspace(*y_lim, n)
+    X, Y = np.meshgrid(x, y)
+
+    if vista is not None:
+        return vista.ax.figure, vista, X, Y
+
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    vista = raster.VistaRaster(ax, x_lim, y_lim)
+
+    ax.set_xlabel('$x$')
+    ax.set_ylabel(eje_y(flujo))
+    ax.set_aspect('equal')
+    ax.set_title(title)
+    return fig, vista, X, Y
+
+
+def _mostrar_raster(fig, vista, units, nueva):
+    if nueva:
+        clb = fig.colorbar(vista.mapeable, ax=vista.ax)
+        clb.ax.set_title(units)
+        plt.show()
+    else:
+        fig.canvas.draw_idle()
+    return vista
+
+
+def campo_de_velocidades_raster(x_lim, y_lim, flujo: Flujo, n=1000, radio_nucleo=0, vista=None):
+    # Textura LIC coloreada por |V|, sin streamplot. Con `vista` (lo que devuelve
+    # una llamada anterior) solo se actualiza la imagen de esa figura.
+    nueva = vista is None
+    fig, vista, X, Y = _raster(x_lim, y_lim, n, flujo, 'Campo de Velocidades', vista)
+
+    f_x, f_y = flujo.campo(X, Y, 'velocidad', radio_nucleo)
+    vista.velocidad(f_x, f_y)
+    return _mostrar_raster(fig, vista, '$|V|$', nueva)
+
+
+def campo_de_presiones_raster(x_lim, y_lim, flujo: Flujo, n=1000, radio_nucleo=0, vista=None):
+    nueva = vista is None
+    fig, vista, X, Y = _raster(x_lim, y_lim, n, flujo, 'Campo de Presiones', vista)
 
-    contour(X, Y, z, 'Campo de Presiones', units='Presión (Pa)')
+    vista.escalar(flujo.campo(X, Y, 'presion', radio_nucleo))
+    return _mostrar_raster(fig, vista, 'Presión (Pa)', nueva)
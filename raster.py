@@ -0,0 +1,141 @@
+import numpy as np
+import matplotlib
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import Normalize
+
+
+_ruidos = {}
+
+
+def ruido(forma, semilla=0, suave=False):
+    # Textura de ruido blanco, una por forma de grilla. Con `suave` se promedia
+    # de a 2x2 pixeles, lo que evita el patron de aliasing al integrar con pasos
+    # de mas de un pixel.
+    if (forma, semilla, suave) not in _ruidos:
+        r = np.random.default_rng(semilla).random(forma, dtype=np.float32)
+        if suave:
+            r = np.pad(r, ((1, 0), (1, 0)), mode='edge')
+            r = (r[1:, 1:] + r[:-1, 1:] + r[1:, :-1] + r[:-1, :-1]) / 4
+        _ruidos[(forma, semilla, suave)] = r
+    return _ruidos[(forma, semilla, suave)]
+
+
+def direccion(v_x, v_y, escala=(1, 1)):
+    # Direccion unitaria en pixeles; los puntos enmascarados o de velocidad nula quedan en 0
+    u = np.ma.filled(v_x, 0).astype(np.float32) / np.float32(escala[0])
+    v = np.ma.filled(v_y, 0).astype(np.float32) / np.float32(escala[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        norma = np.hypot(u, v)
+        return np.where(norma > 0, u / norma, 0), np.where(norma > 0, v / norma, 0)
+
+
+def lic(v_x, v_y, longitud=20, escala=(1, 1), textura=None, paso=2, direcciones=None):
+    """
+    Line integral convolution: promedia una textura de ruido a lo largo de
+    las lineas de corriente que pasan por cada pixel. Todos los pixeles se
+    integran a la vez con pasos de Euler de `paso` pixeles hasta recorrer
+    `longitud` pixeles hacia adelante y hacia atras. `escala` = (dx, dy) de
+    la grilla; `direcciones` permite pasar el resultado de `direccion`.
+
+    La direccion, la textura y un peso (0 en un borde de un pixel alrededor
+    de la grilla) van juntos en una tabla float32, asi que cada paso es una
+    sola lectura indexada; las particulas que salen quedan detenidas en el
+    borde sin sumar.
+    """
+    ny, nx = np.shape(v_x)
+    textura = ruido((ny, nx), suave=paso > 1) if textura is None else textura
+    u, v = direccion(v_x, v_y, escala) if direcciones is None else direcciones
+
+    tabla = np.zeros((ny + 2, nx + 2, 4), dtype=np.float32)
+    tabla[1:-1, 1:-1, 0] = u * paso
+    tabla[1:-1, 1:-1, 1] = v * paso
+    tabla[1:-1, 1:-1, 2] = textura
+    tabla[1:-1, 1:-1, 3] = 1
+    tabla = tabla.reshape(-1, 4)
+    ancho = nx + 2
+
+    # Coordenadas en la tabla con borde, corridas en 0.5 para que truncar sea redondear
+    j0, i0 = np.meshgrid(np.arange(nx, dtype=np.float32) + 1.5, np.arange(ny, dtype=np.float32) + 1.5)
+    acumulado = np.array(textura, dtype=np.float32).ravel()
+    pesos = np.ones(nx * ny, dtype=np.float32)
+
+    for signo in (1, -1):
+        px, py = j0.ravel().copy(), i0.ravel().copy()
+        fila = tabla[(i0.astype(np.int32) * ancho + j0.astype(np.int32)).ravel()]
+        for _ in range(max(1, round(longitud / paso))):
+            if signo > 0:
+                px += fila[:, 0]
+                py += fila[:, 1]
+            else:
+                px -= fila[:, 0]
+                py -= fila[:, 1]
+            np.clip(px, 0.5, nx + 1.5, out=px)
+            np.clip(py, 0.5, ny + 1.5, out=py)
+            fila = np.take(tabla, py.astype(np.int32) * ancho + px.astype(np.int32), axis=0)
+            acumulado += fila[:, 2]
+            pesos += fila[:, 3]
+
+    return (acumulado / pesos).reshape(ny, nx)
+
+
+def rango(z, percentiles=(1, 99)):
+    # Percentiles de los valores validos. Los arreglos enmascarados (Flujo.campo)
+    # ya tienen los no finitos en la mascara; solo los ndarray se revisan
+    valores = z.compressed() if isinstance(z, np.ma.MaskedArray) else np.ma.masked_invalid(z).compressed()
+    if valores.size == 0:
+        return 0, 1
+    return tuple(np.percentile(valores, percentiles))
+
+
+def colorear(z, cmap='jet', vmin=None, vmax=None, intensidad=None):
+    # Imagen RGBA de z; si se da `intensidad` (ej. LIC) modula el brillo
+    z = z if isinstance(z, np.ma.MaskedArray) else np.ma.masked_invalid(z)
+    rgba = matplotlib.colormaps[cmap](Normalize(vmin, vmax)(z), bytes=False)
+    if intensidad is not None:
+        lo, hi = np.percentile(intensidad, (2, 98))
+        i = np.clip((np.asarray(intensidad) - lo) / max(hi - lo, 1e-12), 0, 1)
+        rgba[..., :3] *= (0.25 + 0.75 * i)[..., np.newaxis]
+    rgba[..., 3] = np.where(np.ma.getmaskarray(z), 0, 1)
+    return rgba
+
+
+class VistaRaster:
+    """
+    Imagen de un campo sobre un eje de matplotlib. Las evaluaciones nuevas
+    solo reemplazan los datos de la imagen (set_data) en vez de volver a
+    dibujar lineas de corriente o contornos.
+    """
+
+    def __init__(self, ax, x_lim, y_lim, cmap='jet'):
+        self.ax = ax
+        self.extent = (*x_lim, *y_lim)
+        self.imagen = None
+        self._lic = None
+        # Para la barra de colores, ya que la imagen es RGBA
+        self.mapeable = ScalarMappable(Normalize(), cmap)
+
+    def _mostrar(self, z, vmin, vmax, intensidad=None):
+        lo, hi = rango(z)
+        self.mapeable.set_clim(lo if vmin is None else vmin, hi if vmax is None else vmax)
+        norma = self.mapeable.norm
+        rgba = colorear(z, self.mapeable.cmap.name, norma.vmin, norma.vmax, intensidad)
+
+        if self.imagen is None:
+            self.imagen = self.ax.imshow(rgba, origin='lower', extent=self.extent, interpolation='nearest')
+        else:
+            self.imagen.set_data(rgba)
+        return self.imagen
+
+    def velocidad(self, v_x, v_y, longitud=20, vmin=None, vmax=None):
+        # La textura LIC solo depende de la direccion: si no cambio se reutiliza
+        ny, nx = np.shape(v_x)
+        escala = ((self.extent[1] - self.extent[0]) / nx, (self.extent[3] - self.extent[2]) / ny)
+        u, v = direccion(v_x, v_y, escala)
+        clave = (longitud, u.shape)
+        if self._lic is None or self._lic[0] != clave or not (np.allclose(u, self._lic[1], atol=1e-3)
+                                                               and np.allclose(v, self._lic[2], atol=1e-3)):
+            self._lic = (clave, u, v, lic(v_x, v_y, longitud, escala, direcciones=(u, v)))
+        return self._mostrar(np.ma.sqrt(v_x ** 2 + v_y ** 2), vmin, vmax, self._lic[3])
+
+    def escalar(self, z, vmin=None, vmax=None):
+        return self._mostrar(z, vmin, vmax)
@@ -0,0 +1,232 @@
+"""
+Servidor HTTP local para evaluar flujos desde otras herramientas.
+
+    python servidor.py --port 8765
+
+POST /evaluar con un JSON de la forma:
+
+    {
+        "flujos": [{"flow": "Fuente", "A": 1, "x0": 0, "y0": 0, "in_scale": 1, "out_scale": 1}],
+        "rho": 1,
+        "condiciones_iniciales": {"x0": -100000, "y0": -100000, "P0": 101300},
+        "grilla": {"x": [-5, 5, 200], "y": [-5, 5, 200]},
+        "campos": ["corriente", "velocidad", "presion"],
+        "radio_nucleo": 0.05,
+        "formato": "json"
+    }
+
+Los flujos usan las mismas propiedades que la interfaz grafica. En lugar de
+"grilla" se puede mandar "puntos": [[x, y], ...]. Con "formato": "binario"
+la respuesta son los arreglos float64 (little endian) concatenados en el
+orden del header X-Campos, con forma X-Forma y NaN en los puntos
+enmascarados. GET /flujos lista los flujos y campos disponibles.
+"""
+import argparse
+import asyncio
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+from flujos_esenciales import Flujo, flujos, desde_props
+
+
+class ErrorDePeticion(Exception):
+    pass
+
+
+class Lote:
+    # Peticiones concurrentes por un mismo flujo que se evaluan juntas
+    def __init__(self):
+        self.peticiones = []
+
+    def agregar(self, x, y, campos, radio_nucleo):
+        futuro = asyncio.get_running_loop().create_future()
+        self.peticiones.append((x, y, campos, radio_nucleo, futuro))
+        return futuro
+
+    def evaluar(self, flujo: Flujo):
+        campos = [c for c in Flujo.campos if any(c in p[2] for p in self.peticiones)]
+        x = np.concatenate([p[0] for p in self.peticiones])
+        y = np.concatenate([p[1] for p in self.peticiones])
+        total = flujo.evaluar(x, y, campos)
+
+        resultados = []
+        inicio = 0
+        for x_i, y_i, campos_i, radio_nucleo, _ in self.peticiones:
+            fin = inicio + len(x_i)
+            res = {}
+            for campo in campos_i:
+                valor = total[campo]
+                res[campo] = tuple(v[inicio:fin] for v in valor) if isinstance(valor, tuple) else valor[inicio:fin]
+            res['mascara'] = total['mascara'][inicio:fin] | flujo.nucleo(x_i, y_i, radio_nucleo)
+            resultados.append(res)
+            inicio = fin
+        return resultados
+
+
+class Servidor:
+    def __init__(self, ventana=0.002, tamano_cache=64, max_puntos=4 * 10 ** 6):
+        # ventana: segundos que se esperan para juntar peticiones por el mismo flujo
+        self.ventana = ventana
+        self.tamano_cache = tamano_cache
+        self.max_puntos = max_puntos
+        self.cache = OrderedDict()
+        self.lotes = {}
+
+    def compilar(self, definicion):
+        clave = json.dumps({k: definicion.get(k) for k in ('flujos', 'rho', 'condiciones_iniciales')}, sort_keys=True)
+        if clave in self.cache:
+            self.cache.move_to_end(clave)
+            return clave, self.cache[clave]
+
+        props = definicion.get('flujos')
+        if not props:
+            raise ErrorDePeticion('Se debe definir al menos un flujo')
+        try:
+            flujo = desde_props(props[0])
+            for p in props[1:]:
+                flujo += desde_props(p)
+        except KeyError as e:
+            raise ErrorDePeticion(f'Propiedad o flujo desconocido: {e}')
+
+        flujo.set_rho(definicion.get('rho', 1))
+        condiciones = definicion.get('condiciones_iniciales')
+        if condiciones is not None:
+            flujo.set_initial_conditions(condiciones['x0'], condiciones['y0'], condiciones['P0'])
+
+        self.cache[clave] = flujo
+        if len(self.cache) > self.tamano_cache:
+            self.cache.popitem(last=False)
+        return clave, flujo
+
+    def puntos(self, definicion):
+        if 'grilla' in definicion:
+            x_lim, y_lim = definicion['grilla']['x'], definicion['grilla']['y']
+            x = np.linspace(x_lim[0], x_lim[1], int(x_lim[2]))
+            y = np.linspace(y_lim[0], y_lim[1], int(y_lim[2]))
+            X, Y = np.meshgrid(x, y)
+            return X.ravel(), Y.ravel(), X.shape
+        elif 'puntos' in definicion:
+            p = np.asarray(definicion['puntos'], dtype=float).reshape(-1, 2)
+            return p[:, 0], p[:, 1], (len(p),)
+        raise ErrorDePeticion('Se debe entregar "grilla" o "puntos"')
+
+    async def evaluar(self, definicion):
+        if not isinstance(definicion, dict):
+            raise ErrorDePeticion('El cuerpo debe ser un objeto JSON')
+        clave, flujo = self.compilar(definicion)
+        x, y, forma = self.puntos(definicion)
+        if len(x) > self.max_puntos:
+            raise ErrorDePeticion(f'Demasiados puntos ({len(x)} > {self.max_puntos})')
+
+        campos = definicion.get('campos', ['corriente', 'potencial', 'velocidad'])
+        if not set(campos) <= set(Flujo.campos):
+            raise ErrorDePeticion(f'Los campos validos son: {", ".join(Flujo.campos)}')
+        if 'presion' in campos and flujo.initial_condition is None:
+            raise ErrorDePeticion('Para la presion se deben entregar "condiciones_iniciales"')
+
+        lote = self.lotes.get(clave)
+        if lote is None:
+            lote = self.lotes[clave] = Lote()
+            asyncio.get_running_loop().create_task(self._procesar(clave, flujo))
+        res = await lote.agregar(x, y, campos, definicion.get('radio_nucleo', 0))
+        return campos, res, forma
+
+    async def _procesar(self, clave, flujo):
+        await asyncio.sleep(self.ventana)
+        lote = self.lotes.pop(clave)
+        try:
+            resultados = await asyncio.get_running_loop().run_in_executor(None, lote.evaluar, flujo)
+        except Exception as e:
+            for *_, futuro in lote.peticiones:
+                futuro.set_exception(e)
+            return
+        for (*_, futuro), res in zip(lote.peticiones, resultados):
+            futuro.set_result(res)
+
+    @staticmethod
+    def arreglos(campos, res, forma):
+        # (nombre, arreglo con NaN en los puntos enmascarados) en orden de salida
+        mascara = res['mascara']
+        salida = []
+        for campo in campos:
+            valor = res[campo]
+            nombres = (f'{campo}_x', f'{campo}_y') if isinstance(valor, tuple) else (campo,)
+            valores = valor if isinstance(valor, tuple) else (valor,)
+            for nombre, v in zip(nombres, valores):
+                salida.append((nombre, np.where(mascara, np.nan, v).reshape(forma)))
+        return salida
+
+    async def manejar(self, reader, writer):
+        try:
+            metodo, ruta, _ = (await reader.readline()).decode('latin-1').split()
+            headers = {}
+            while True:
+                linea = (await reader.readline()).decode('latin-1').strip()
+                if not linea:
+                    break
+                nombre, _, valor = linea.partition(':')
+                headers[nombre.strip().lower()] = valor.strip()
+            cuerpo = await reader.readexactly(int(headers.get('content-length', 0)))
+        except (ValueError, asyncio.IncompleteReadError):
+            await self.responder(writer, 400, {'error': 'Peticion HTTP invalida'})
+            return
+
+        if metodo == 'GET' and ruta == '/flujos':
+            await self.responder(writer, 200, {'flujos': list(flujos), 'campos': list(Flujo.campos)})
+        elif metodo == 'POST' and ruta == '/evaluar':
+            try:
+                definicion = json.loads(cuerpo)
+                campos, res, forma = await self.evaluar(definicion)
+            except (ErrorDePeticion, ValueError, KeyError, TypeError) as e:
+                await self.responder(writer, 400, {'error': str(e)})
+                return
+            except Exception as e:
+                await self.responder(writer, 500, {'error': str(e)})
+                return
+
+            arreglos = self.arreglos(campos, res, forma)
+            if definicion.get('formato', 'json') == 'binario':
+                headers = {
+                    'X-Campos': ','.join(nombre for nombre, _ in arreglos),
+                    'X-Forma': ','.join(str(n) for n in forma),
+                }
+                cuerpo = b''.join(a.astype('<f8').tobytes() for _, a in arreglos)
+                await self.responder(writer, 200, cuerpo, 'application/octet-stream', headers)
+            else:
+                datos = {nombre: np.where(np.isnan(a), None, a).tolist() for nombre, a in arreglos}
+                await self.responder(writer, 200, {'forma': list(forma), 'campos': datos})
+        else:
+            await self.responder(writer, 404, {'error': f'{metodo} {ruta} no existe'})
+
+    @staticmethod
+    async def responder(writer, estado, cuerpo, tipo='application/json', headers=None):
+        if tipo == 'application/json':
+            cuerpo = json.dumps(cuerpo).encode()
+        razones = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}
+        lineas = [f'HTTP/1.1 {estado} {razones[estado]}', f'Content-Type: {tipo}',
+                  f'Content-Length: {len(cuerpo)}', 'Connection: close']
+        lineas += [f'{k}: {v}' for k, v in (headers or {}).items()]
+        writer.write(('\r\n'.join(lineas) + '\r\n\r\n').encode('latin-1') + cuerpo)
+        await writer.drain()
+        writer.close()
+
+    async def servir(self, port=8765):
+        # Solo se escucha en localhost: el servicio no tiene autenticacion
+        server = await asyncio.start_server(self.manejar, '127.0.0.1', port)
+        print(f'Sirviendo en http://127.0.0.1:{port}')
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor local de evaluacion de flujos')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    asyncio.run(Servidor().servir(args.port))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+from collections import namedtuple
+
+import contourpy
+import numpy as np
+from matplotlib.path import Path
+
+from flujos_esenciales import Flujo
+
+
+Distribucion = namedtuple('Distribucion', ['x', 'y', 's', 'theta', 'v_x', 'v_y', 'V', 'Cp', 'P'])
+
+
+def circulo(radio, centro=(0, 0), n=360):
+    theta = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    return centro[0] + radio * np.cos(theta), centro[1] + radio * np.sin(theta)
+
+
+def _remuestrear(x, y, n, cerrada):
+    # n puntos equiespaciados en longitud de arco sobre la poligonal (x, y)
+    if cerrada:
+        x, y = np.append(x, x[0]), np.append(y, y[0])
+    s = np.concatenate(([0], np.cumsum(np.hypot(np.diff(x), np.diff(y)))))
+    t = np.linspace(0, s[-1], n, endpoint=not cerrada)
+    return np.interp(t, s, x), np.interp(t, s, y)
+
+
+def poligono(vertices, n=400, cerrado=True):
+    vertices = np.asarray(vertices, dtype=float)
+    return _remuestrear(vertices[:, 0], vertices[:, 1], n, cerrado)
+
+
+def _gradiente(flujo: Flujo, x, y):
+    # grad(psi) = (-v_y, v_x) en 2D y r * (-v_r, v_x) en axisimetrico
+    v_x, v_y = flujo.velocidad(x, y)
+    escala = y if flujo.axisimetrico else 1
+    return -escala * v_y, escala * v_x
+
+
+def _tramos(flujo: Flujo, lineas, x_lim, y_lim, h, tolerancia):
+    """
+    Corta las lineas en los puntos de estancamiento (minimos locales de
+    |grad(psi)|), elimina los puntos con grad(psi) = 0 (el eje en flujos
+    axisimetricos) y descarta los tramos que salen de la region o pasan por
+    una singularidad: quedan solo los tramos de la superficie.
+    """
+    g = [np.hypot(*_gradiente(flujo, linea[:, 0], linea[:, 1])) for linea in lineas]
+    mediana = np.median(np.concatenate(g))
+    singularidades = np.array(flujo.singularidades, dtype=complex)
+
+    tramos = []
+    for linea, g_i in zip(lineas, g):
+        g_i = np.where(np.isfinite(g_i), g_i, np.inf)
+        cerrada = np.allclose(linea[0], linea[-1])
+        if cerrada:
+            # Los vecinos son ciclicos; se quita el punto repetido
+            linea, g_i = linea[:-1], g_i[:-1]
+            anterior, siguiente = np.roll(g_i, 1), np.roll(g_i, -1)
+        else:
+            anterior, siguiente = np.append(np.inf, g_i[:-1]), np.append(g_i[1:], np.inf)
+        cortes = np.flatnonzero((g_i <= anterior) & (g_i <= siguiente) & (g_i < tolerancia * mediana))
+
+        if cerrada:
+            # Se rota para que la linea empiece y termine en un corte
+            inicio = cortes[0] if len(cortes) else 0
+            linea, g_i = np.roll(linea, -inicio, axis=0), np.roll(g_i, -inicio)
+            linea, g_i = np.vstack((linea, linea[:1])), np.append(g_i, g_i[0])
+            cortes = (cortes - inicio) % (len(linea) - 1)
+        esquinas = cortes
+        cortes = np.unique(np.concatenate(([0], cortes, [len(linea) - 1])))
+
+        for inicio, fin in zip(cortes[:-1], cortes[1:]):
+            # Los puntos de corte quedan en la linea divisoria, se dejan fuera de ambos tramos
+            puntos = np.arange(inicio, fin + 1)
+            puntos = puntos[~np.isin(puntos % (len(linea) - 1) if cerrada else puntos, esquinas)]
+            tramo = linea[puntos][g_i[puntos] > 1e-3 * mediana]
+            if len(tramo) < 2:
+                continue
+            x, y = tramo[:, 0], tramo[:, 1]
+            # En axisimetrico el borde inferior es el eje, no el limite de la region
+            borde = (np.min(x) < x_lim[0] + h or np.max(x) > x_lim[1] - h or np.max(y) > y_lim[1] - h
+                     or (np.min(y) < y_lim[0] + h and not flujo.axisimetrico))
+            cerca = singularidades.size and np.min(np.abs((x + y * 1j)[:, None] - singularidades)) < 2 * h
+            if not borde and not cerca:
+                tramos.append(tramo)
+    return tramos
+
+
+def _unir(tramos, distancia):
+    # Encadena tramos por el extremo mas cercano mientras la distancia sea menor a `distancia`
+    cadenas = []
+    tramos = list(tramos)
+    while tramos:
+        cadena = tramos.pop(int(np.argmax([len(t) for t in tramos])))
+        while tramos:
+            d = [(np.hypot(*(t[0] - cadena[-1])), i, False) for i, t in enumerate(tramos)]
+            d += [(np.hypot(*(t[-1] - cadena[-1])), i, True) for i, t in enumerate(tramos)]
+            minimo, i, invertir = min(d)
+            if minimo > distancia:
+                break
+            tramo = tramos.pop(i)
+            cadena = np.concatenate((cadena, tramo[::-1] if invertir else tramo))
+        cadenas.append(cadena)
+    return cadenas
+
+
+def isolinea(flujo: Flujo, valor, x_lim, y_lim, n=400, resolucion=200, iteraciones=3, tolerancia=0.25):
+    """
+    Linea de corriente psi = valor (ej. la superficie de un cuerpo). Se ubica
+    con un contorno sobre una grilla gruesa, se remuestrea a n puntos y se
+    proyecta sobre psi = valor con pasos de Newton usando grad(psi).
+
+    Las lineas de contorno se cortan en los puntos de estancamiento, donde la
+    superficie se junta con las lineas divisorias (ej. el eje y = 0 para
+    psi = 0 en el cilindro), y se vuelven a unir solo los tramos que no salen
+    de la region ni pasan por singularidades. Se usa la curva cerrada mas
+    larga que encierra alguna singularidad; si no hay, la linea mas larga.
+    En flujos axisimetricos se entrega el meridiano abierto de eje a eje.
+    """
+    x = np.linspace(*x_lim, resolucion)
+    y = np.linspace(*y_lim, resolucion)
+    X, Y = np.meshgrid(x, y)
+    h = max(np.ptp(X), np.ptp(Y)) / resolucion
+
+    lineas = contourpy.contour_generator(X, Y, flujo.campo(X, Y, 'corriente')).lines(valor)
+    if not lineas:
+        raise ValueError(f'No hay linea de corriente psi = {valor} en la region')
+
+    # En axisimetrico la superficie es un meridiano que empieza y termina en el eje;
+    # se cierra con su reflejo para ver si encierra las singularidades
+    if flujo.axisimetrico:
+        cadenas = [c for c in _unir(_tramos(flujo, lineas, x_lim, y_lim, h, tolerancia), 10 * h)
+                   if abs(c[0, 1]) < 10 * h and abs(c[-1, 1]) < 10 * h and len(c) > 2]
+        poligonos = [np.vstack((c, c[::-1] * (1, -1))) for c in cadenas]
+    else:
+        cadenas = [c for c in _unir(_tramos(flujo, lineas, x_lim, y_lim, h, tolerancia), 10 * h)
+                   if np.hypot(*(c[0] - c[-1])) < 10 * h and len(c) > 2]
+        poligonos = cadenas
+    singularidades = [(s.real, s.imag) for s in flujo.singularidades]
+    cuerpos = [c for c, p in zip(cadenas, poligonos) if singularidades and Path(p).contains_points(singularidades).any()]
+
+    linea = max(cuerpos or cadenas or lineas, key=len)
+    cerrada = bool(cuerpos or cadenas) and not flujo.axisimetrico
+    if cerrada and np.allclose(linea[0], linea[-1]):
+        linea = linea[:-1]
+    x, y = _remuestrear(linea[:, 0], linea[:, 1], n, cerrada)
+
+    # Cerca de puntos de estancamiento grad(psi) se anula: el paso se limita a una celda
+    for _ in range(iteraciones):
+        g_x, g_y = _gradiente(flujo, x, y)
+        g = np.hypot(g_x, g_y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            paso = np.minimum(np.abs(flujo.corriente(x, y) - valor) / g, h) * np.sign(flujo.corriente(x, y) - valor) / g
+        paso = np.where(np.isfinite(paso), paso, 0)
+        x, y = x - paso * g_x, y - paso * g_y
+
+    return x, y
+
+
+def centroide(x, y, axisimetrico=False):
+    """
+    Centroide del area encerrada por la curva (x, y), que se toma como
+    cerrada. Un meridiano axisimetrico se cierra con su reflejo en el eje,
+    asi que su centroide queda sobre el eje. Si el area es nula (curva
+    abierta sobre una recta) se usa el promedio de los puntos.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if axisimetrico:
+        x, y = np.concatenate((x, x[::-1])), np.concatenate((y, -y[::-1]))
+
+    cruz = x * np.roll(y, -1) - np.roll(x, -1) * y
+    area = np.sum(cruz) / 2
+    if np.isclose(area, 0, atol=1e-12 * (np.ptp(x) * np.ptp(y) + 1e-300)):
+        return np.mean(x), 0 if axisimetrico else np.mean(y)
+    return (np.sum((x + np.roll(x, -1)) * cruz) / (6 * area),
+            0 if axisimetrico else np.sum((y + np.roll(y, -1)) * cruz) / (6 * area))
+
+
+def distribucion(flujo: Flujo, x, y, v_ref=None, centro=None):
+    """
+    Velocidad, Cp y presion sobre la curva (x, y). La velocidad de referencia
+    es la de las condiciones iniciales salvo que se entregue v_ref; sin
+    condiciones iniciales P queda en None. theta se mide desde `centro`, por
+    defecto el centroide del cuerpo (ver `centroide`), que en flujos
+    axisimetricos esta sobre el eje.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    v_x, v_y = flujo.velocidad(x, y)
+    V2 = v_x ** 2 + v_y ** 2
+
+    if flujo.initial_condition is not None:
+        (v0_x, v0_y), P0 = flujo.initial_condition
+        V02 = v0_x ** 2 + v0_y ** 2
+        P = P0 + (flujo.rho / 2) * (V02 - V2)
+    elif v_ref is None:
+        raise Exception('Initial conditions must be set')
+    else:
+        P = None
+
+    if v_ref is not None:
+        V02 = v_ref ** 2
+
+    s = np.concatenate(([0], np.cumsum(np.hypot(np.diff(x), np.diff(y)))))
+    x_c, y_c = centroide(x, y, flujo.axisimetrico) if centro is None else centro
+    theta = np.mod(np.arctan2(y - y_c, x - x_c), 2 * np.pi)
+
+    return Distribucion(x, y, s, theta, v_x, v_y, np.sqrt(V2), 1 - V2 / V02, P)
+
+
+if __name__ == '__main__':
+    # Verificacion: Cp = 1 - 4 sin^2(theta) sobre el cilindro, ubicado como la linea psi = 0
+    from flujos_esenciales import Uniform, Doblete
+
+    cilindro = Uniform(1) + Doblete(1)
+    d = distribucion(cilindro, *isolinea(cilindro, 0, (-5, 5), (-5, 5)), v_ref=1)
+    assert np.allclose(np.hypot(d.x, d.y), 1, atol=1e-6)
+    assert np.allclose(d.Cp, 1 - 4 * np.sin(d.theta) ** 2, atol=1e-4)
+    print('ok')